@@ -1,9 +1,308 @@
+import argparse
+import hashlib
+import json
+import re
+import tempfile
+import zlib
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from backend.app.services import sample_data
+
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+BOILERPLATE_RE = re.compile(
+    r"this (paper|article|submission) (has been|was|is) withdrawn"
+    r"|withdrawn by the author|duplicate submission|abstract not available"
+    r"|no abstract|this is a test|lorem ipsum|to appear in|see (the )?full text"
+)
+# Every boilerplate phrase contains one of these; checking them first skips the
+# regex for almost all records. Both run on lowercased text.
+BOILERPLATE_HINTS = (
+    "withdrawn",
+    "duplicate",
+    "abstract",
+    "lorem",
+    "test",
+    "appear",
+    "full text",
+)
+MIN_TITLE_CHARS = 8
+MIN_ABSTRACT_CHARS = 80
+
+# MinHash over word 3-gram shingles, banded for LSH: 16 bands of 4 rows put
+# the 50%-collision point near Jaccard 0.5; candidates are then verified
+# against NEAR_DUP_THRESHOLD using the full signatures.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+NEAR_DUP_THRESHOLD = 0.8
+CHUNK_SIZE = 512
+MAX_LISTED = 50
+
+# Multiply-shift hashing, (a * x + b) >> 32 in wrapping uint64 arithmetic,
+# stands in for the NUM_PERM random permutations.
+_MASK32 = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(7)
+_PERM_A = _rng.randint(0, 2**63 - 1, size=(NUM_PERM, 1), dtype=np.int64)
+_PERM_A = _PERM_A.astype(np.uint64) | np.uint64(1)
+_PERM_B = _rng.randint(0, 2**63 - 1, size=(NUM_PERM, 1), dtype=np.int64).astype(
+    np.uint64
+)
+
+
+def _is_boilerplate(text):
+    text = text.lower()
+    if not any(hint in text for hint in BOILERPLATE_HINTS):
+        return False
+    return BOILERPLATE_RE.search(text) is not None
+
+
+def text_flags(titles, abstracts):
+    title_lens = np.fromiter((len(t.strip()) for t in titles), dtype=np.int64)
+    abstract_lens = np.fromiter((len(a.strip()) for a in abstracts), dtype=np.int64)
+    short = (title_lens < MIN_TITLE_CHARS) | (abstract_lens < MIN_ABSTRACT_CHARS)
+    boilerplate = np.fromiter(map(_is_boilerplate, abstracts), dtype=bool)
+    return short, boilerplate
+
+
 def detect_noisy_samples(records):
-    # Placeholder heuristics; swap with embedding/LLM checks later.
+    if not records:
+        return []
+    titles = [r.get("title", "") for r in records]
+    abstracts = [r.get("abstract", "") for r in records]
+    short, boilerplate = text_flags(titles, abstracts)
     noisy = []
-    for idx, r in enumerate(records):
-        title = r.get("title", "").strip()
-        abstract = r.get("abstract", "").strip()
-        if len(title) < 8 or len(abstract) < 80:
-            noisy.append({"index": idx, "reason": "short_text"})
+    for idx in np.flatnonzero(short | boilerplate).tolist():
+        reason = "short_text" if short[idx] else "boilerplate"
+        noisy.append({"index": idx, "reason": reason})
     return noisy
+
+
+def minhash_signatures(token_docs):
+    # One uint32 signature row per document. Shingle hashes for the whole
+    # chunk are permuted in a single (NUM_PERM x shingles) array and reduced
+    # per document with minimum.reduceat.
+    lengths = np.fromiter(map(len, token_docs), dtype=np.int64, count=len(token_docs))
+    tokens = list(chain.from_iterable(token_docs))
+    hashes = np.fromiter(
+        map(zlib.crc32, map(str.encode, tokens)), dtype=np.uint64, count=len(tokens)
+    )
+    shingle_counts = np.maximum(lengths - 2, 0)
+    doc_starts = np.r_[0, np.cumsum(lengths)[:-1]]
+    shingle_starts = np.r_[0, np.cumsum(shingle_counts)[:-1]]
+    total = int(shingle_counts.sum())
+    positions = np.repeat(doc_starts, shingle_counts) + (
+        np.arange(total) - np.repeat(shingle_starts, shingle_counts)
+    )
+
+    signatures = np.full((len(token_docs), NUM_PERM), 0xFFFFFFFF, dtype=np.uint32)
+    has_shingles = shingle_counts > 0
+    if total:
+        shingles = hashes[positions]
+        shingles = shingles * np.uint64(1000003) ^ hashes[positions + 1]
+        shingles = (shingles * np.uint64(1000003) ^ hashes[positions + 2]) & _MASK32
+        permuted = (_PERM_A * shingles + _PERM_B) >> np.uint64(32)
+        reduced = np.minimum.reduceat(permuted, shingle_starts[has_shingles], axis=1)
+        signatures[has_shingles] = reduced.T
+    return signatures, has_shingles
+
+
+def band_keys(signatures):
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    keys = np.zeros((len(signatures), BANDS), dtype=np.uint64)
+    for row in range(ROWS):
+        keys = keys * np.uint64(0x100000001B3) ^ bands[:, :, row]
+    return keys
+
+
+def _leader_pairs(keys, candidates):
+    # Pairs every member of a group of equal keys with the group's first
+    # member, which links the group with a linear number of edges.
+    if len(candidates) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+    leaders = np.repeat(candidates[order[starts]], sizes)
+    members = candidates[order]
+    linked = leaders != members
+    return np.stack([leaders[linked], members[linked]], axis=1)
+
+
+def _exact_hash(tokens):
+    digest = hashlib.blake2b(" ".join(tokens).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _iter_records(data_path):
+    with data_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _iter_chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_quality(data_path, work_dir):
+    label_ids = {}
+    codes, exact, tokenized, keys, has = [], [], [], [], []
+    short, boilerplate = [], []
+    signature_path = Path(work_dir) / "signatures.u32"
+    with signature_path.open("wb") as signature_file:
+        for chunk in _iter_chunks(_iter_records(data_path), CHUNK_SIZE):
+            # Preprocessing keeps the title on the first line.
+            parts = [r["text"].split("\n", 1) for r in chunk]
+            titles = [p[0] for p in parts]
+            abstracts = [p[1] if len(p) > 1 else "" for p in parts]
+            chunk_short, chunk_boilerplate = text_flags(titles, abstracts)
+            token_docs = [WORD_RE.findall(r["text"].lower()) for r in chunk]
+            signatures, chunk_has = minhash_signatures(token_docs)
+            signature_file.write(signatures.tobytes())
+
+            codes.append(
+                [label_ids.setdefault(r["label"], len(label_ids)) for r in chunk]
+            )
+            exact.append([_exact_hash(tokens) for tokens in token_docs])
+            tokenized.append([bool(tokens) for tokens in token_docs])
+            keys.append(band_keys(signatures))
+            has.append(chunk_has)
+            short.append(chunk_short)
+            boilerplate.append(chunk_boilerplate)
+
+    if not codes:
+        return {"total_records": 0}, None
+    codes = np.concatenate([np.asarray(c, dtype=np.int32) for c in codes])
+    exact = np.concatenate([np.asarray(e, dtype=np.uint64) for e in exact])
+    tokenized = np.concatenate([np.asarray(t, dtype=bool) for t in tokenized])
+    keys = np.concatenate(keys)
+    has = np.concatenate(has)
+    short = np.concatenate(short)
+    boilerplate = np.concatenate(boilerplate)
+    total = len(codes)
+    signatures = np.memmap(
+        signature_path, dtype=np.uint32, mode="r", shape=(total, NUM_PERM)
+    )
+
+    # Records without a single token all hash alike; they are not duplicates
+    # of one another (the short-text flag already covers them).
+    with_tokens = np.flatnonzero(tokenized)
+    exact_pairs = _leader_pairs(exact[with_tokens], with_tokens)
+
+    # Near duplicates: LSH candidates from every band, verified on signatures.
+    shingled = np.flatnonzero(has)
+    candidates = np.concatenate(
+        [_leader_pairs(keys[shingled, band], shingled) for band in range(BANDS)]
+    )
+    if len(candidates):
+        encoded = np.unique(candidates[:, 0] * total + candidates[:, 1])
+        candidates = np.stack([encoded // total, encoded % total], axis=1)
+        similarity = np.concatenate(
+            [
+                (signatures[batch[:, 0]] == signatures[batch[:, 1]]).mean(axis=1)
+                for batch in np.array_split(
+                    candidates, max(1, len(candidates) // 100_000)
+                )
+            ]
+        )
+        near_pairs = candidates[similarity >= NEAR_DUP_THRESHOLD]
+    else:
+        near_pairs = candidates
+
+    pairs = np.concatenate([exact_pairs, near_pairs])
+    graph = coo_matrix(
+        (np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])),
+        shape=(total, total),
+    )
+    _, component = connected_components(graph, directed=False)
+    component_sizes = np.bincount(component)
+    in_group = component_sizes[component] > 1
+
+    label_names = list(label_ids)
+    groups = []
+    # Only grouped records are split into components; on a clean corpus
+    # nearly every component is a singleton and would cost a loop iteration.
+    grouped = np.flatnonzero(in_group)
+    order = grouped[np.argsort(component[grouped], kind="stable")]
+    ordered = component[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    for members in np.split(order, starts[1:]) if len(order) else []:
+        labels = sorted({label_names[c] for c in codes[members].tolist()})
+        groups.append(
+            {
+                "indices": members.tolist(),
+                "kind": "exact" if len(set(exact[members].tolist())) == 1 else "near",
+                "labels": labels,
+            }
+        )
+    groups.sort(key=lambda g: len(g["indices"]), reverse=True)
+    conflicts = [g for g in groups if len(g["labels"]) > 1]
+
+    # A group's first record counts as the original; the rest are duplicates.
+    exact_dups = len(np.unique(exact_pairs[:, 1]))
+    all_dups = int(in_group.sum()) - len(groups)
+    noisy = short | boilerplate | in_group
+    index = {
+        "total_records": total,
+        "flags": {
+            "short_text": int(short.sum()),
+            "boilerplate": int(boilerplate.sum()),
+            "exact_duplicate": exact_dups,
+            "near_duplicate": max(0, all_dups - exact_dups),
+            "label_conflict_groups": len(conflicts),
+        },
+        "duplicate_groups": len(groups),
+        "noisy_rate": float(noisy.mean()),
+        "samples": {
+            "short_text": np.flatnonzero(short)[:MAX_LISTED].tolist(),
+            "boilerplate": np.flatnonzero(boilerplate)[:MAX_LISTED].tolist(),
+        },
+        "top_duplicate_groups": groups[:MAX_LISTED],
+        "label_conflicts": conflicts[:MAX_LISTED],
+    }
+    flags = {
+        "short_text": short,
+        "boilerplate": boilerplate,
+        "duplicate_group": np.where(in_group, component, -1),
+    }
+    return index, flags
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=str(sample_data.DATA_DIR / "papers.jsonl"))
+    parser.add_argument(
+        "--out", default=str(sample_data.ARTIFACTS_DIR / "data_quality.json")
+    )
+    args = parser.parse_args()
+
+    data_path = Path(args.data)
+    if not data_path.exists():
+        raise FileNotFoundError(f"Missing {data_path}. Run preprocessing first.")
+    with tempfile.TemporaryDirectory() as work_dir:
+        index, flags = analyze_quality(data_path, work_dir)
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    if flags is not None:
+        # Per-record flags, aligned with papers.jsonl line numbers.
+        np.savez_compressed(out_path.with_name(out_path.stem + "_flags.npz"), **flags)
+    print(f"Checked {index['total_records']} records -> {out_path}")
+
+
+if __name__ == "__main__":
+    main()
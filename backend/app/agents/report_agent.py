@@ -1,10 +1,217 @@
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+
+from backend.app.services import sample_data
+from backend.app.services.artifact_cache import artifact_cache
+from backend.app.services.trends import bucket_end, bucket_key
+
+
+REPORT_TITLE = "Weekly Research Intelligence Report"
+MAX_LABEL_DELTAS = 20
+TOP_MOVERS = 3
+
+
 def generate_weekly_report(kpis, trends):
     # Minimal agentic stub: turns metrics into a narrative summary.
     return {
-        "title": "Weekly Research Intelligence Report",
+        "title": REPORT_TITLE,
         "highlights": [
             f"F1 reached {kpis['f1']:.2%} with recall at {kpis['recall']:.2%}.",
             f"Trend momentum peaked at {max(t['value'] for t in trends)}.",
             "Top growth domains: NLP and Bioinformatics.",
         ],
     }
+
+
+def label_deltas(index):
+    # The latest complete ISO week against the calendar week before it, per
+    # label, straight from the pre-aggregated trend index. A week still in
+    # progress is skipped, since comparing it would show a false drop; a
+    # previous week with no papers is absent from the index and counts as 0.
+    buckets, counts, _ = index.levels["week"]
+    last = index.complete_count("week") - 1
+    # The first week of data has nothing to be compared against.
+    if last < 1:
+        return None
+    current = counts[:, last]
+    previous_key = bucket_key(bucket_end(buckets[last], "week") - timedelta(days=7), "week")
+    if buckets[last - 1] == previous_key:
+        previous = counts[:, last - 1]
+    else:
+        previous = np.zeros_like(current)
+    deltas = [
+        {
+            "label": label,
+            "current": int(current[row]),
+            "previous": int(previous[row]),
+            "delta": int(current[row] - previous[row]),
+            "change": (
+                float((current[row] - previous[row]) / previous[row])
+                if previous[row]
+                else None
+            ),
+        }
+        for label, row in index.rows.items()
+    ]
+    return {
+        "period": buckets[last],
+        "previous_period": previous_key,
+        "current_total": int(current.sum()),
+        "previous_total": int(previous.sum()),
+        "partial_period": buckets[-1] if last < len(buckets) - 1 else None,
+        "labels": deltas,
+    }
+
+
+def top_movers(deltas, limit=TOP_MOVERS):
+    ranked = sorted(deltas, key=lambda item: (-item["delta"], item["label"]))
+    rising = [item for item in ranked if item["delta"] > 0][:limit]
+    ranked.sort(key=lambda item: (item["delta"], item["label"]))
+    falling = [item for item in ranked if item["delta"] < 0][:limit]
+    return {"rising": rising, "falling": falling}
+
+
+def quality_notes(quality):
+    flags = quality["flags"]
+    notes = [
+        f"Data QA flagged {quality['noisy_rate']:.1%} of records as noisy "
+        f"({flags.get('short_text', 0)} short, "
+        f"{flags.get('boilerplate', 0)} boilerplate)."
+    ]
+    duplicates = flags.get("exact_duplicate", 0) + flags.get("near_duplicate", 0)
+    if duplicates:
+        notes.append(
+            f"{duplicates} duplicate records across "
+            f"{quality['duplicate_groups']} groups."
+        )
+    conflicts = flags.get("label_conflict_groups", 0)
+    if conflicts:
+        notes.append(f"{conflicts} duplicate groups carry conflicting labels.")
+    return notes
+
+
+def _change_text(current, previous):
+    if not previous:
+        return f"{current} papers"
+    return f"{(current - previous) / previous:+.1%} ({previous} to {current})"
+
+
+def build_report(kpis, index, quality):
+    # The narrative is assembled from aggregates only: KPIs, the trend index
+    # and the data-QA summary. No corpus scan happens at request time.
+    # Without data_quality.json the QA section is left out rather than
+    # quoting the demo numbers as if they were measured.
+    notes = None if quality is sample_data.FALLBACK_DATA_QUALITY else quality_notes(quality)
+    if index is None:
+        report = generate_weekly_report(kpis, sample_data.get_trend_series())
+        report["data_quality"] = notes
+        return report
+
+    highlights = [f"F1 reached {kpis['f1']:.2%} with recall at {kpis['recall']:.2%}."]
+    weekly = label_deltas(index)
+    movers = None
+    if weekly is not None:
+        highlights.append(
+            f"Publication volume in {weekly['period']}: "
+            f"{_change_text(weekly['current_total'], weekly['previous_total'])} "
+            "week over week."
+        )
+        movers = top_movers(weekly["labels"])
+        if movers["rising"]:
+            growth = ", ".join(
+                f"{item['label']} (+{item['delta']})" for item in movers["rising"]
+            )
+            highlights.append(f"Top growth domains: {growth}.")
+        if movers["falling"]:
+            decline = ", ".join(
+                f"{item['label']} ({item['delta']})" for item in movers["falling"]
+            )
+            highlights.append(f"Largest declines: {decline}.")
+        weekly["labels"] = sorted(
+            weekly["labels"], key=lambda item: (-item["current"], item["label"])
+        )[:MAX_LABEL_DELTAS]
+
+    if notes:
+        highlights.append(notes[0])
+    return {
+        "title": REPORT_TITLE,
+        "highlights": highlights,
+        "label_deltas": weekly,
+        "top_movers": movers,
+        "data_quality": notes,
+    }
+
+
+def _report_artifacts():
+    return [
+        *sample_data._dashboard_artifacts(),
+        sample_data.ARTIFACTS_DIR / "data_quality.json",
+    ]
+
+
+class ReportEngine:
+    # Reports memoized on the versions of every artifact they read, with LRU
+    # eviction. A lookup costs a handful of stat() calls; pregenerate() lets
+    # the artifact watcher build the next report before anyone asks for it.
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self):
+        return tuple(artifact_cache.version(path) for path in _report_artifacts())
+
+    def get(self):
+        key = self._key()
+        with self._lock:
+            report = self._entries.get(key)
+            if report is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return report
+            self.misses += 1
+
+        # One build at a time; a caller that waited here usually finds the
+        # report already built by the one ahead of it.
+        with self._build_lock:
+            with self._lock:
+                report = self._entries.get(key)
+            if report is None:
+                report = build_report(
+                    sample_data.get_kpis(),
+                    sample_data.get_trend_index(),
+                    sample_data.get_data_quality(),
+                )
+                with self._lock:
+                    self._entries[key] = report
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return report
+
+    def pregenerate(self):
+        self.get()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+report_engine = ReportEngine()
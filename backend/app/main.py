@@ -1,9 +1,41 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
-from backend.app.routers import analytics, health
+from backend.app.agents.report_agent import report_engine
+from backend.app.middleware.cache_control import CacheControlMiddleware
+from backend.app.middleware.compression import CompressionMiddleware
+from backend.app.middleware.timing import TimingMiddleware
+from backend.app.routers import analytics, health, metrics, predict
+from backend.app.services.inference import classifier
+from backend.app.services.live_updates import live_updates
+from backend.app.services.profiler import profiler
+from backend.app.services.serialization import FastJSONResponse
+from backend.app.services.transformer_inference import transformer
+
+
+@asynccontextmanager
+async def lifespan(app):
+    classifier.load()
+    transformer.load()
+    if profiler is not None:
+        profiler.start()
+    live_updates.add_listener(report_engine.pregenerate)
+    await live_updates.start()
+    yield
+    await live_updates.stop()
+    if profiler is not None:
+        profiler.stop()
+    classifier.close()
+    transformer.close()
 
-app = FastAPI(title="Agentic Research Intelligence API")
+
+app = FastAPI(
+    title="Agentic Research Intelligence API",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,7 +44,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CacheControlMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(TimingMiddleware)
 
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
-
+app.include_router(predict.router, prefix="/predict", tags=["predict"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
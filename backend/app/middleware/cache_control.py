@@ -0,0 +1,56 @@
+from starlette.datastructures import MutableHeaders
+
+
+# Path prefix -> Cache-Control, longest prefix wins. Ages follow how often
+# the backing artifact is rewritten: model reports and label stats once per
+# training run, the trend index once per preprocessing run, the data-QA
+# report more rarely still. stale-while-revalidate lets the browser or a CDN
+# answer immediately from its copy while refetching in the background; the
+# dashboard ETag keeps those refetches down to a 304.
+CACHE_POLICIES = {
+    "/analytics": "public, max-age=60, stale-while-revalidate=600",
+    "/analytics/trend-series": "public, max-age=300, stale-while-revalidate=3600",
+    "/analytics/weekly-report": "public, max-age=300, stale-while-revalidate=3600",
+    "/analytics/similar": "public, max-age=300, stale-while-revalidate=3600",
+    "/analytics/data-quality": "public, max-age=600, stale-while-revalidate=86400",
+    "/health": "no-store",
+    "/metrics": "no-store",
+    "/predict": "no-store",
+}
+
+
+class CacheControlMiddleware:
+    # Adds the matching policy to successful GET/HEAD responses that did not
+    # set their own Cache-Control. no-store applies whatever the outcome.
+    def __init__(self, app, policies=None):
+        self.app = app
+        policies = CACHE_POLICIES if policies is None else policies
+        self.policies = sorted(policies.items(), key=lambda item: -len(item[0]))
+
+    def _policy(self, path):
+        for prefix, policy in self.policies:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return policy
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        policy = self._policy(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+        cacheable = scope["method"] in ("GET", "HEAD")
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                applies = policy == "no-store" or (
+                    cacheable and message["status"] in (200, 304)
+                )
+                if applies and "cache-control" not in headers:
+                    headers["Cache-Control"] = policy
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
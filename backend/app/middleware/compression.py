@@ -0,0 +1,151 @@
+import gzip
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+
+# Streams the client holds open must not be buffered or compressed.
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+def _accepted(header):
+    encodings = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits=31 writes the gzip header and trailer, as gzip.compress does.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self._compressor.process(chunk)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    # gzip, or brotli when it is installed and the client accepts it. A
+    # response that arrives in one piece is compressed only above
+    # minimum_size; a streamed one is compressed chunk by chunk.
+    def __init__(
+        self,
+        app,
+        minimum_size=int(os.environ.get("COMPRESSION_MIN_SIZE", "512")),
+        gzip_level=int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6")),
+        brotli_quality=int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "5")),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, scope):
+        accepted = _accepted(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, encoding, body):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _stream(self, encoding):
+        if encoding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        stream = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, stream, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "").split(";")[0].strip()
+                passthrough = (
+                    "content-encoding" in headers
+                    or media_type in UNCOMPRESSIBLE_TYPES
+                    or message["status"] in (204, 304)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows the size.
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The compressed bytes are a different representation.
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+                    stream = self._stream(encoding)
+                else:
+                    body = self._compress(encoding, body)
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+                if stream is None:
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            chunk = stream.compress(body)
+            if not more_body:
+                chunk += stream.finish()
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_wrapper)
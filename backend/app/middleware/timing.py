@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from backend.app.services.metrics import request_latency
+from backend.app.services.profiler import profiler
+
+
+class TimingMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware so the response body is passed
+    # through untouched. Latency is labelled with the matched route template
+    # (e.g. /analytics/trend-series), not the raw path, to bound cardinality.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message["headers"]
+                )
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finished = time.perf_counter()
+            template = _route_template(scope)
+            request_latency.observe(
+                finished - started, template, scope["method"], str(status)
+            )
+            # An event stream is slow by design; profiling it is noise.
+            if profiler is not None and not streaming:
+                await asyncio.to_thread(profiler.record, template, started, finished)
+
+
+def _route_template(scope):
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = getattr(route, "path_format", None) or getattr(route, "path", "")
+    # A matched route without parameters is its own template; using the
+    # request path keeps router prefixes in the label.
+    if "{" not in template:
+        return scope["path"]
+    return template
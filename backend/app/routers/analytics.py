@@ -1,44 +1,210 @@
-from fastapi import APIRouter
+import asyncio
+from datetime import date
+from typing import Literal
 
-from backend.app.agents.report_agent import generate_weekly_report
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from backend.app.agents.report_agent import report_engine
+from backend.app.schemas import (
+    Dashboard,
+    DataQuality,
+    DistributionItem,
+    Insights,
+    Kpis,
+    RadarItem,
+    SimilarPapers,
+    TrendPoint,
+)
+from backend.app.services.live_updates import live_updates
+from backend.app.services.offload import single_flight
 from backend.app.services.sample_data import (
+    get_dashboard,
+    get_dashboard_etag,
     get_data_insights,
+    get_data_quality,
     get_entity_distribution,
     get_kpis,
     get_radar_metrics,
     get_trend_series,
 )
+from backend.app.services.serialization import FastJSONResponse, encode
+from backend.app.services.similarity import similar_papers
+from backend.app.services.snapshot import snapshot_store
 
 router = APIRouter()
 
 
-@router.get("/kpis")
-def kpis():
-    return get_kpis()
+def _etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _encoded(compute, *args):
+    # Encodes on the analytics executor, once per coalesced flight.
+    return encode(compute(*args))
+
+
+def _section_or_compute(name, compute, *args):
+    # Pre-serialized bytes from the training-time snapshot when there is one,
+    # otherwise the live payload encoded. Runs on the analytics executor.
+    snapshot = snapshot_store.get()
+    if snapshot is not None and name in snapshot.sections:
+        return snapshot.sections[name]
+    return _encoded(compute, *args)
+
+
+async def _flight(key, fn, *args):
+    body = await single_flight.do(key, fn, *args)
+    # Coalesced requests share the bytes, so each gets its own Response.
+    return FastJSONResponse(body)
+
+
+async def _panel(name, compute, *args):
+    return await _flight((name, *args), _section_or_compute, name, compute, *args)
+
+
+@router.get("/kpis", response_model=Kpis)
+async def kpis():
+    return await _panel("kpis", get_kpis)
 
 
-@router.get("/entity-distribution")
-def entity_distribution():
-    return get_entity_distribution()
+@router.get("/entity-distribution", response_model=list[DistributionItem])
+async def entity_distribution():
+    return await _panel("distribution", get_entity_distribution)
 
 
-@router.get("/radar-metrics")
-def radar_metrics():
-    return get_radar_metrics()
+@router.get("/radar-metrics", response_model=list[RadarItem])
+async def radar_metrics():
+    return await _panel("radar", get_radar_metrics)
 
 
-@router.get("/trend-series")
-def trend_series():
-    return get_trend_series()
+@router.get("/trend-series", response_model=list[TrendPoint])
+async def trend_series(
+    granularity: Literal["day", "week", "month"] = "month",
+    start: date | None = None,
+    end: date | None = None,
+    label: str | None = None,
+    periods: int = Query(6, ge=1, le=5000),
+    include_partial: bool = False,
+):
+    # Only the default view is part of the snapshot. By default the bucket
+    # still in progress is left out; include_partial=true keeps it.
+    if (
+        granularity == "month"
+        and periods == 6
+        and not (start or end or label or include_partial)
+    ):
+        return await _panel("trend", get_trend_series)
+    return await _flight(
+        ("trend", granularity, start, end, label, periods, include_partial),
+        _encoded,
+        get_trend_series,
+        granularity,
+        start,
+        end,
+        label,
+        periods,
+        include_partial,
+    )
 
 
-@router.get("/insights")
-def insights():
-    return get_data_insights()
+@router.get("/insights", response_model=Insights)
+async def insights():
+    return await _panel("insights", get_data_insights)
+
+
+@router.get("/data-quality", response_model=DataQuality)
+async def data_quality():
+    return await _panel("data_quality", get_data_quality)
+
+
+def _dashboard_version():
+    snapshot = snapshot_store.get()
+    if snapshot is not None:
+        return snapshot.etag, snapshot.body
+    return get_dashboard_etag(), None
+
+
+@router.get("/dashboard", response_model=Dashboard)
+async def dashboard(request: Request):
+    # One payload for every panel; unchanged artifacts answer 304.
+    etag, body = await single_flight.do("dashboard-version", _dashboard_version)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if body is not None:
+        return FastJSONResponse(body, headers={"ETag": etag})
+    # Keyed on the ETag so a flight started before an artifact changed never
+    # hands its older body out under the newer tag.
+    body = await single_flight.do(("dashboard", etag), _encoded, get_dashboard)
+    return FastJSONResponse(body, headers={"ETag": etag})
+
+
+async def _events(request, queue):
+    try:
+        # A reconnecting EventSource sends the last version it saw; if
+        # nothing changed since, it only needs the updates from here on.
+        # New clients, and any client before the first successful refresh,
+        # always get the snapshot.
+        last_seen = request.headers.get("last-event-id")
+        version = live_updates.version
+        if last_seen is None or version is None or last_seen != version:
+            yield live_updates.snapshot_event()
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection.
+                yield b": keep-alive\n\n"
+    finally:
+        live_updates.unsubscribe(queue)
+
+
+@router.get("/stream")
+async def stream(request: Request):
+    # Server-sent events: the full dashboard once, then only changed sections.
+    await live_updates.start()
+    queue = live_updates.subscribe()
+    return StreamingResponse(
+        _events(request, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/weekly-report")
-def weekly_report():
-    kpis = get_kpis()
-    trends = get_trend_series()
-    return generate_weekly_report(kpis, trends)
+async def weekly_report():
+    return await _flight("weekly-report", _encoded, report_engine.get)
+
+
+@router.get("/similar", response_model=SimilarPapers)
+async def similar(
+    paper: int | None = None,
+    q: str | None = Query(None, min_length=1, max_length=10000),
+    k: int = Query(10, ge=1, le=100),
+    nprobe: int = Query(8, ge=1, le=1024),
+    exact: bool = False,
+):
+    # Nearest papers by embedding, either to a corpus record or to free text.
+    if (paper is None) == (q is None):
+        raise HTTPException(status_code=422, detail="Pass exactly one of paper or q.")
+    try:
+        return await _flight(
+            ("similar", paper, q, k, nprobe, exact),
+            _encoded,
+            similar_papers,
+            paper,
+            q,
+            k,
+            nprobe,
+            exact,
+        )
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -1,8 +1,15 @@
 from fastapi import APIRouter
 
+from backend.app.services.artifact_cache import artifact_cache
+
 router = APIRouter()
 
 
 @router.get("")
 def health_check():
     return {"status": "ok"}
+
+
+@router.get("/cache")
+def cache_stats():
+    return artifact_cache.stats()
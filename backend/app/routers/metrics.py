@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.app.services.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
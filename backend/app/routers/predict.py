@@ -0,0 +1,39 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from backend.app.services.inference import classifier
+from backend.app.services.transformer_inference import transformer
+
+router = APIRouter()
+
+MODELS = {"classifier": classifier, "transformer": transformer}
+
+
+class Paper(BaseModel):
+    title: str
+    abstract: str
+
+
+class PredictRequest(BaseModel):
+    items: list[Paper] = Field(min_length=1)
+
+
+@router.post("")
+async def predict(request: PredictRequest, model: str = "classifier"):
+    service = MODELS.get(model)
+    if service is None:
+        raise HTTPException(status_code=404, detail=f"Unknown model '{model}'.")
+    if not service.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model '{model}' not available. Train it first.",
+        )
+    # Same text layout as training/preprocess_arxiv.py.
+    texts = [
+        f"{' '.join(item.title.split())}\n{item.abstract.strip()}"
+        for item in request.items
+    ]
+    predictions = await asyncio.wrap_future(service.submit(texts))
+    return {"model": service.name, "predictions": predictions}
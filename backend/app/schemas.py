@@ -0,0 +1,77 @@
+from pydantic import BaseModel, TypeAdapter
+
+
+class Kpis(BaseModel):
+    precision: float
+    recall: float
+    f1: float
+    accuracy: float
+
+
+class DistributionItem(BaseModel):
+    label: str
+    value: float
+
+
+class RadarItem(BaseModel):
+    metric: str
+    value: float
+
+
+class TrendPoint(BaseModel):
+    period: str
+    value: float
+
+
+class LabelCount(BaseModel):
+    label: str
+    count: int
+
+
+class Insights(BaseModel):
+    total_records: int
+    unique_labels: int
+    top_labels: list[LabelCount]
+    top_terms_global: list[str]
+
+
+class DataQuality(BaseModel):
+    total_records: int
+    flags: dict[str, int]
+    duplicate_groups: int
+    noisy_rate: float
+    label_conflicts: list
+
+
+class Dashboard(BaseModel):
+    kpis: Kpis
+    distribution: list[DistributionItem]
+    radar: list[RadarItem]
+    trend: list[TrendPoint]
+    insights: Insights
+
+
+class SimilarPaper(BaseModel):
+    id: int
+    title: str
+    label: str
+    published: str | None
+    score: float | None = None
+
+
+class SimilarPapers(BaseModel):
+    query: SimilarPaper | None
+    method: str
+    neighbors: list[SimilarPaper]
+
+
+# Snapshot section name -> schema, used to validate payloads once when they
+# are built rather than on every response.
+SECTION_SCHEMAS = {
+    "kpis": TypeAdapter(Kpis),
+    "distribution": TypeAdapter(list[DistributionItem]),
+    "radar": TypeAdapter(list[RadarItem]),
+    "trend": TypeAdapter(list[TrendPoint]),
+    "insights": TypeAdapter(Insights),
+    "data_quality": TypeAdapter(DataQuality),
+}
@@ -0,0 +1,72 @@
+import json
+import threading
+from collections import OrderedDict
+
+from backend.app.services.metrics import stage_latency
+
+
+class ArtifactCache:
+    # Parsed JSON artifacts keyed on path; an entry is reused until the
+    # file's (mtime, size) changes, i.e. until a training job rewrites it.
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def version(path):
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def load_json(self, path):
+        key = str(path)
+        version = self.version(path)
+        with self._lock:
+            if version is None:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        try:
+            with stage_latency.time("artifact_io"):
+                raw = path.read_bytes()
+            with stage_latency.time("json_decode"):
+                value = json.loads(raw)
+        except (OSError, ValueError):
+            value = None
+
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+artifact_cache = ArtifactCache()
@@ -0,0 +1,151 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import joblib
+
+from backend.app.services import sample_data
+
+
+def format_predictions(classes, probabilities):
+    best = probabilities.argmax(axis=1)
+    return [
+        {
+            "label": classes[best[i]],
+            "probability": float(row[best[i]]),
+            "probabilities": dict(zip(classes, row.tolist())),
+        }
+        for i, row in enumerate(probabilities)
+    ]
+
+
+class MicroBatcher:
+    # Collects texts submitted by concurrent requests and runs them through
+    # `predict_batch` together. A batch closes once it holds `max_batch` texts
+    # or `max_wait` seconds after its first request arrived.
+    def __init__(self, predict_batch, max_batch=64, max_wait=0.005):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, texts):
+        future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def _collect(self, first):
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = []
+            for item_texts, future in self._collect(first):
+                if item_texts:
+                    batch.append((item_texts, future))
+                else:
+                    future.set_result([])
+            if not batch:
+                continue
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                results = self.predict_batch(texts)
+            except Exception as exc:
+                if len(batch) == 1:
+                    _set_exception(batch[0][1], exc)
+                else:
+                    # One bad request should not fail the others batched
+                    # with it; retry each on its own.
+                    self._run_each(batch)
+                continue
+            start = 0
+            for item_texts, future in batch:
+                future.set_result(results[start : start + len(item_texts)])
+                start += len(item_texts)
+
+    def _run_each(self, batch):
+        for item_texts, future in batch:
+            try:
+                future.set_result(self.predict_batch(item_texts))
+            except Exception as exc:
+                _set_exception(future, exc)
+
+
+def _set_exception(future, exc):
+    # Future.set_exception rejects StopIteration; it is wrapped so the caller
+    # still gets an answer.
+    if isinstance(exc, StopIteration):
+        wrapped = RuntimeError(f"Prediction failed: {exc!r}")
+        wrapped.__cause__ = exc
+        exc = wrapped
+    future.set_exception(exc)
+
+
+class ClassifierService:
+    # Serves the TF-IDF + LogisticRegression pipeline saved by
+    # training/train_classifier.py.
+    name = "tfidf_logreg"
+
+    def __init__(self, filename="classifier.joblib", **batcher_options):
+        self.filename = filename
+        self.model = None
+        self.batcher = MicroBatcher(self.predict_batch, **batcher_options)
+
+    @property
+    def ready(self):
+        return self.model is not None
+
+    def load(self):
+        path = sample_data.ARTIFACTS_DIR / self.filename
+        if not path.exists():
+            return False
+        self.model = joblib.load(path)
+        # Touch every stage once so the first real request is not the slow one.
+        self.model.predict_proba(["warm up"])
+        self.batcher.start()
+        return True
+
+    def close(self):
+        self.batcher.stop()
+
+    def predict_batch(self, texts):
+        classes = [str(label) for label in self.model.classes_]
+        return format_predictions(classes, self.model.predict_proba(texts))
+
+    def submit(self, texts):
+        return self.batcher.submit(texts)
+
+
+classifier = ClassifierService()
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+
+from backend.app.services import sample_data
+from backend.app.services.artifact_cache import artifact_cache
+from backend.app.services.offload import executor
+from backend.app.services.serialization import encode
+from backend.app.services.snapshot import SNAPSHOT_NAME, snapshot_store
+
+try:
+    from watchfiles import awatch
+except ImportError:  # optional: pip install watchfiles (inotify on Linux)
+    awatch = None
+
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_SECTIONS = ("kpis", "distribution", "radar", "trend", "insights")
+
+
+def _watched_paths():
+    return [
+        *sample_data._dashboard_artifacts(),
+        sample_data.ARTIFACTS_DIR / "data_quality.json",
+        sample_data.ARTIFACTS_DIR / SNAPSHOT_NAME,
+    ]
+
+
+def _current_state():
+    # (version, {section: encoded bytes}); runs on the analytics executor.
+    snapshot = snapshot_store.get()
+    if snapshot is not None:
+        return snapshot.version, {
+            name: snapshot.sections[name] for name in DASHBOARD_SECTIONS
+        }
+    dashboard = sample_data.get_dashboard()
+    version = sample_data.get_dashboard_etag().strip('"')
+    return version, {name: encode(dashboard[name]) for name in DASHBOARD_SECTIONS}
+
+
+def format_event(kind, version, sections):
+    # Section bytes are already JSON, so the event is assembled rather than
+    # re-encoded.
+    body = b",".join(
+        b'"' + name.encode() + b'":' + payload for name, payload in sections.items()
+    )
+    data = b'{"version":"' + version.encode() + b'","sections":{' + body + b"}}"
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (version.encode(), kind, data)
+
+
+class LiveUpdates:
+    # One watcher for the artifact and processed-data directories, fanned out
+    # to every connected stream. On a change the dashboard is rebuilt once and
+    # only the sections whose bytes differ are pushed. inotify via watchfiles
+    # when it is installed and the directories exist, otherwise a stat() poll.
+    def __init__(
+        self,
+        interval=float(os.environ.get("LIVE_POLL_SECONDS", "1.0")),
+        queue_size=8,
+    ):
+        self.interval = interval
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._listeners = []
+        self._listener_futures = set()
+        self._version = None
+        self._sections = {}
+        self._task = None
+        self._ready = asyncio.Event()
+
+    async def start(self):
+        # Idempotent; the first stream starts the watcher if the app
+        # lifespan has not.
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+        await self._ready.wait()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._ready = asyncio.Event()
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def add_listener(self, fn):
+        # fn() runs on the analytics executor after every artifact change,
+        # e.g. to pre-build derived results.
+        if fn not in self._listeners:
+            self._listeners.append(fn)
+
+    def snapshot_event(self):
+        # Before the first successful refresh there is no version yet.
+        return format_event(b"snapshot", self._version or "", self._sections)
+
+    @property
+    def version(self):
+        return self._version
+
+    async def _watch(self):
+        # Streams wait on _ready, so it is set even if the first build fails.
+        try:
+            await self._safe_refresh()
+        finally:
+            self._ready.set()
+        directories = {str(path.parent) for path in _watched_paths()}
+        if awatch is not None and all(os.path.isdir(d) for d in directories):
+            names = {path.name for path in _watched_paths()}
+            async for _ in awatch(
+                *directories, watch_filter=lambda _, p: os.path.basename(p) in names
+            ):
+                await self._safe_refresh()
+            return
+
+        versions = [artifact_cache.version(path) for path in _watched_paths()]
+        while True:
+            await asyncio.sleep(self.interval)
+            current = [artifact_cache.version(path) for path in _watched_paths()]
+            if current != versions:
+                versions = current
+                await self._safe_refresh()
+
+    async def _safe_refresh(self):
+        # A bad artifact (e.g. a half-written or malformed file) must not end
+        # the watcher: log it, keep serving the last good state and try again
+        # on the next change.
+        try:
+            await self._refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Live update refresh failed")
+
+    async def _refresh(self):
+        loop = asyncio.get_running_loop()
+        version, sections = await loop.run_in_executor(executor, _current_state)
+        for fn in self._listeners:
+            future = loop.run_in_executor(executor, fn)
+            # Held until done so failures are logged rather than lost.
+            self._listener_futures.add(future)
+            future.add_done_callback(self._listener_done)
+        changed = {
+            name: payload
+            for name, payload in sections.items()
+            if self._sections.get(name) != payload
+        }
+        self._version = version
+        self._sections = sections
+        if changed and self._subscribers:
+            self._publish(format_event(b"update", version, changed))
+
+    def _listener_done(self, future):
+        self._listener_futures.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Live update listener failed", exc_info=future.exception())
+
+    def _publish(self, event):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A client this far behind gets the full state instead.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot_event())
+
+
+live_updates = LiveUpdates()
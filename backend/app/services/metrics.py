@@ -0,0 +1,101 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+# Seconds; spans a cached snapshot hit through a cold artifact load.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class Histogram:
+    # Cumulative-bucket histogram per label set, in the shape Prometheus
+    # expects. Observations are a bisect and three additions under a lock.
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = [
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self._series.items()
+            ]
+        for labels, counts, total, count in sorted(series):
+            base = _format_labels(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _format_labels([*zip(self.label_names, labels), ("le", repr(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels([*zip(self.label_names, labels), ("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{base} {total}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs):
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+request_latency = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template, method and status.",
+    ("route", "method", "status"),
+)
+stage_latency = Histogram(
+    "analytics_stage_duration_seconds",
+    "Time spent in artifact I/O, JSON decode, serialization and response rendering.",
+    ("stage",),
+)
+
+
+def render_metrics():
+    # Imported here so the cache module can itself report into stage_latency.
+    from backend.app.services.artifact_cache import artifact_cache
+
+    lines = request_latency.render() + stage_latency.render()
+    cache = artifact_cache.stats()
+    for name in ("hits", "misses"):
+        lines.append(f"# TYPE artifact_cache_{name}_total counter")
+        lines.append(f"artifact_cache_{name}_total {cache[name]}")
+    lines.append("# TYPE artifact_cache_entries gauge")
+    lines.append(f"artifact_cache_entries {cache['entries']}")
+    return "\n".join(lines) + "\n"
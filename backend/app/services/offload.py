@@ -0,0 +1,35 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Artifact I/O and panel computations run here rather than on the event loop
+# or Starlette's shared threadpool, so a burst of dashboard loads cannot
+# starve other handlers.
+executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ANALYTICS_WORKERS", "4")),
+    thread_name_prefix="analytics",
+)
+
+
+class SingleFlight:
+    # Concurrent callers asking for the same key share one in-flight call.
+    # Only touched from the event loop thread, so the dict needs no lock.
+    def __init__(self):
+        self._inflight = {}
+
+    async def do(self, key, fn, *args):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so one client disconnecting does not cancel the others.
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,112 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+
+
+# Leaf frames of threads that are parked rather than working; sampling them
+# would bury the request's own stacks.
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+}
+
+
+class SlowRequestProfiler:
+    # A background thread snapshots every thread's stack at a fixed interval
+    # into a bounded ring. When a request finishes slower than the threshold,
+    # the samples inside its time window are written out as folded stacks
+    # ("frame;frame;frame count"), ready for flamegraph.pl or speedscope.
+    def __init__(self, threshold, interval=0.005, out_dir=None, window=30.0):
+        self.threshold = threshold
+        self.interval = interval
+        self.out_dir = Path(out_dir or "artifacts/profiles")
+        self._samples = deque(maxlen=max(1, int(window / interval)))
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="slow-request-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                self._samples.append((now, names.get(ident, str(ident)), _fold(frame)))
+
+    def record(self, route, started, finished):
+        elapsed = finished - started
+        if elapsed < self.threshold:
+            return None
+        stacks = Counter(
+            f"{thread};{stack}"
+            for at, thread, stack in list(self._samples)
+            if started <= at <= finished
+        )
+        if not stacks:
+            return None
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+        path = self.out_dir / (
+            f"{datetime.now():%Y%m%d-%H%M%S-%f}-{slug}-{elapsed * 1000:.0f}ms.folded"
+        )
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()),
+                encoding="utf-8",
+            )
+        except OSError:
+            # A full disk must not turn a slow request into a failed one.
+            return None
+        return path
+
+
+def _fold(frame):
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def profiler_from_env():
+    # Off unless PROFILE_SLOW_MS is set; sampling costs a little on every
+    # thread, so it is opt-in for production.
+    threshold_ms = os.environ.get("PROFILE_SLOW_MS")
+    if not threshold_ms:
+        return None
+    return SlowRequestProfiler(
+        threshold=float(threshold_ms) / 1000,
+        interval=float(os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1000,
+        out_dir=os.environ.get("PROFILE_DIR"),
+    )
+
+
+profiler = profiler_from_env()
@@ -1,28 +1,101 @@
-import json
+import hashlib
+import os
 from pathlib import Path
 
+from backend.app.schemas import SECTION_SCHEMAS
+from backend.app.services.artifact_cache import artifact_cache
+from backend.app.services.serialization import static_payload
+from backend.app.services.trends import TREND_FORMAT, trend_index_for
+
 
 ROOT_DIR = Path(__file__).resolve().parents[3]
-ARTIFACTS_DIR = ROOT_DIR / "artifacts"
-DATA_DIR = ROOT_DIR / "data" / "processed"
+ARTIFACTS_DIR = Path(os.environ.get("ARTIFACTS_DIR", ROOT_DIR / "artifacts"))
+DATA_DIR = Path(os.environ.get("PROCESSED_DATA_DIR", ROOT_DIR / "data" / "processed"))
 
 
 def _read_json(path):
-    if not path.exists():
-        return None
-    try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return None
+    # Cached objects are shared across requests; callers must not mutate them.
+    return artifact_cache.load_json(path)
 
 
-def _fallback_kpis():
-    return {
+# Fallback panels are module-level constants, validated and encoded once; like
+# cached artifacts they are shared and must not be mutated.
+FALLBACK_KPIS = static_payload(
+    {
         "precision": 0.818,
         "recall": 0.888,
         "f1": 0.851,
         "accuracy": 0.842,
-    }
+    },
+    SECTION_SCHEMAS["kpis"],
+)
+FALLBACK_DISTRIBUTION = static_payload(
+    [
+        {"label": "NLP", "value": 36},
+        {"label": "CV", "value": 24},
+        {"label": "Robotics", "value": 12},
+        {"label": "Bioinformatics", "value": 18},
+        {"label": "Security", "value": 10},
+    ],
+    SECTION_SCHEMAS["distribution"],
+)
+FALLBACK_RADAR = static_payload(
+    [
+        {"metric": "Precision", "value": 0.82},
+        {"metric": "Recall", "value": 0.89},
+        {"metric": "F1", "value": 0.85},
+        {"metric": "Coverage", "value": 0.78},
+        {"metric": "Drift", "value": 0.18},
+    ],
+    SECTION_SCHEMAS["radar"],
+)
+FALLBACK_TREND = static_payload(
+    [
+        {"period": "Jan", "value": 62},
+        {"period": "Feb", "value": 68},
+        {"period": "Mar", "value": 74},
+        {"period": "Apr", "value": 71},
+        {"period": "May", "value": 79},
+        {"period": "Jun", "value": 85},
+    ],
+    SECTION_SCHEMAS["trend"],
+)
+FALLBACK_INSIGHTS = static_payload(
+    {
+        "total_records": 10000,
+        "unique_labels": 12,
+        "top_labels": [
+            {"label": "cs.AI", "count": 2100},
+            {"label": "cs.LG", "count": 1800},
+            {"label": "cs.CL", "count": 1600},
+        ],
+        "top_terms_global": [
+            "model",
+            "learning",
+            "neural",
+            "network",
+            "data",
+            "training",
+        ],
+    },
+    SECTION_SCHEMAS["insights"],
+)
+FALLBACK_DATA_QUALITY = static_payload(
+    {
+        "total_records": 10000,
+        "flags": {
+            "short_text": 96,
+            "boilerplate": 12,
+            "exact_duplicate": 41,
+            "near_duplicate": 33,
+            "label_conflict_groups": 9,
+        },
+        "duplicate_groups": 58,
+        "noisy_rate": 0.018,
+        "label_conflicts": [],
+    },
+    SECTION_SCHEMAS["data_quality"],
+)
 
 
 def get_kpis():
@@ -33,7 +106,7 @@ def get_kpis():
         ARTIFACTS_DIR / "report.json"
     )
     if not summary or not report:
-        return _fallback_kpis()
+        return FALLBACK_KPIS
 
     macro_avg = report.get("macro avg", {})
     precision = macro_avg.get("precision")
@@ -41,7 +114,7 @@ def get_kpis():
     f1 = summary.get("macro_f1") or macro_avg.get("f1-score")
     accuracy = summary.get("accuracy")
     if None in (precision, recall, f1, accuracy):
-        return _fallback_kpis()
+        return FALLBACK_KPIS
 
     return {
         "precision": float(precision),
@@ -54,13 +127,7 @@ def get_kpis():
 def get_entity_distribution():
     stats = _read_json(DATA_DIR / "label_stats.json")
     if not stats:
-        return [
-            {"label": "NLP", "value": 36},
-            {"label": "CV", "value": 24},
-            {"label": "Robotics", "value": 12},
-            {"label": "Bioinformatics", "value": 18},
-            {"label": "Security", "value": 10},
-        ]
+        return FALLBACK_DISTRIBUTION
 
     total = sum(stats.values()) or 1
     top_labels = sorted(stats.items(), key=lambda x: x[1], reverse=True)[:6]
@@ -71,15 +138,12 @@ def get_entity_distribution():
 
 
 def get_radar_metrics():
-    kpis = get_kpis()
-    if kpis == _fallback_kpis():
-        return [
-            {"metric": "Precision", "value": 0.82},
-            {"metric": "Recall", "value": 0.89},
-            {"metric": "F1", "value": 0.85},
-            {"metric": "Coverage", "value": 0.78},
-            {"metric": "Drift", "value": 0.18},
-        ]
+    return _radar_from_kpis(get_kpis())
+
+
+def _radar_from_kpis(kpis):
+    if kpis == FALLBACK_KPIS:
+        return FALLBACK_RADAR
 
     coverage = min(1.0, kpis["recall"] + 0.02)
     drift = max(0.0, 1 - kpis["accuracy"])
@@ -92,36 +156,37 @@ def get_radar_metrics():
     ]
 
 
-def get_trend_series():
-    return [
-        {"month": "Jan", "value": 62},
-        {"month": "Feb", "value": 68},
-        {"month": "Mar", "value": 74},
-        {"month": "Apr", "value": 71},
-        {"month": "May", "value": 79},
-        {"month": "Jun", "value": 85},
-    ]
+def get_trend_index():
+    document = _read_json(DATA_DIR / "trend_index.json")
+    if not document or document.get("format") != TREND_FORMAT:
+        return None
+    return trend_index_for(document)
+
+
+def get_trend_series(
+    granularity="month",
+    start=None,
+    end=None,
+    label=None,
+    periods=6,
+    include_partial=False,
+):
+    index = get_trend_index()
+    if index is None:
+        return FALLBACK_TREND
+
+    return index.query(
+        granularity,
+        start=start,
+        end=end,
+        label=label,
+        periods=periods,
+        include_partial=include_partial,
+    )
 
 
 def get_data_insights():
-    fallback = {
-        "total_records": 10000,
-        "unique_labels": 12,
-        "top_labels": [
-            {"label": "cs.AI", "count": 2100},
-            {"label": "cs.LG", "count": 1800},
-            {"label": "cs.CL", "count": 1600},
-        ],
-        "top_terms_global": [
-            "model",
-            "learning",
-            "neural",
-            "network",
-            "data",
-            "training",
-        ],
-    }
-
+    fallback = FALLBACK_INSIGHTS
     insights = _read_json(ARTIFACTS_DIR / "data_insights.json")
     if not insights:
         return fallback
@@ -139,3 +204,48 @@ def get_data_insights():
         "top_labels": top_labels or fallback["top_labels"],
         "top_terms_global": insights.get("top_terms_global", fallback["top_terms_global"]),
     }
+
+
+def get_data_quality():
+    report = _read_json(ARTIFACTS_DIR / "data_quality.json")
+    if not report or "flags" not in report:
+        return FALLBACK_DATA_QUALITY
+
+    return {
+        "total_records": report["total_records"],
+        "flags": report["flags"],
+        "duplicate_groups": report.get("duplicate_groups", 0),
+        "noisy_rate": report.get("noisy_rate", 0.0),
+        "label_conflicts": report.get("label_conflicts", [])[:10],
+    }
+
+
+def _dashboard_artifacts():
+    return [
+        ARTIFACTS_DIR / "hf_summary.json",
+        ARTIFACTS_DIR / "summary.json",
+        ARTIFACTS_DIR / "hf_report.json",
+        ARTIFACTS_DIR / "report.json",
+        DATA_DIR / "label_stats.json",
+        DATA_DIR / "trend_index.json",
+        ARTIFACTS_DIR / "data_insights.json",
+    ]
+
+
+def get_dashboard_etag():
+    versions = [
+        (path.name, artifact_cache.version(path)) for path in _dashboard_artifacts()
+    ]
+    digest = hashlib.sha1(repr(versions).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def get_dashboard():
+    kpis = get_kpis()
+    return {
+        "kpis": kpis,
+        "distribution": get_entity_distribution(),
+        "radar": _radar_from_kpis(kpis),
+        "trend": get_trend_series(),
+        "insights": get_data_insights(),
+    }
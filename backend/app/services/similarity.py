@@ -0,0 +1,202 @@
+import json
+import mmap
+import threading
+from datetime import date, timedelta
+
+import joblib
+import numpy as np
+
+from backend.app.services import sample_data
+from backend.app.services.artifact_cache import artifact_cache
+from backend.app.services.metrics import stage_latency
+
+
+EPOCH = date(1970, 1, 1)
+# Layout version written by training/build_embeddings.py; keep the two equal.
+EMBEDDINGS_FORMAT = 1
+
+
+def _top_k(scores, k):
+    # Positions of the k best scores, best first, without a full sort.
+    if len(scores) > k:
+        picked = np.argpartition(-scores, k - 1)[:k]
+    else:
+        picked = np.arange(len(scores))
+    return picked[np.argsort(-scores[picked], kind="stable")]
+
+
+class PaperIndex:
+    # Read-only view over artifacts/embeddings (see
+    # training/build_embeddings.py) and the columnar corpus it was built from.
+    # Vectors and corpus columns stay memory-mapped; only the centroids and
+    # list offsets are loaded, so opening the index reads almost nothing.
+    def __init__(self, embeddings_dir, corpus_dir):
+        self.meta = json.loads((embeddings_dir / "meta.json").read_text(encoding="utf-8"))
+        self.vectors = np.load(embeddings_dir / "vectors.npy", mmap_mode="r")
+        self.ids = np.load(embeddings_dir / "ids.npy", mmap_mode="r")
+        self.rows = np.load(embeddings_dir / "rows.npy", mmap_mode="r")
+        self.centroids = np.load(embeddings_dir / "centroids.npy")
+        self.list_offsets = np.load(embeddings_dir / "list_offsets.npy")
+        self.encoder_path = embeddings_dir / "encoder.joblib"
+        self._encoder = None
+        self._encoder_lock = threading.Lock()
+
+        corpus_meta = json.loads((corpus_dir / "meta.json").read_text(encoding="utf-8"))
+        self.label_names = corpus_meta["label_names"]
+        self.corpus_digest = corpus_meta.get("digest")
+        self.label_codes = np.load(corpus_dir / "labels.npy", mmap_mode="r")
+        self.published = np.load(corpus_dir / "published.npy", mmap_mode="r")
+        self.offsets = np.load(corpus_dir / "offsets.npy", mmap_mode="r")
+        with (corpus_dir / "text.bin").open("rb") as f:
+            self._blob = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if self.offsets[-1]
+                else b""
+            )
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def paper(self, i):
+        # Records are "title\nabstract"; only the title is decoded.
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        newline = self._blob.find(b"\n", start, end)
+        day = int(self.published[i])
+        return {
+            "id": int(i),
+            "title": self._blob[start : end if newline < 0 else newline].decode("utf-8"),
+            "label": self.label_names[self.label_codes[i]],
+            "published": (EPOCH + timedelta(days=day)).isoformat() if day >= 0 else None,
+        }
+
+    def vector(self, i):
+        return np.asarray(self.vectors[self.rows[i]])
+
+    def encode(self, text):
+        # Free-text queries need the TF-IDF + SVD encoder; HF-pooled indexes
+        # only answer queries by paper.
+        if not self.encoder_path.exists():
+            return None
+        with self._encoder_lock:
+            if self._encoder is None:
+                self._encoder = joblib.load(self.encoder_path)
+        vector = np.asarray(self._encoder.transform([text])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            # Every score would be 0 and the neighbours arbitrary.
+            raise ValueError("The query has no terms known to the embedding index.")
+        return vector / norm
+
+    def search(self, query, k, nprobe):
+        # IVF: score the centroids, then only the rows of the nprobe closest
+        # lists. Each list is one contiguous slice of vectors.npy.
+        nprobe = min(nprobe, len(self.centroids))
+        lists = _top_k(self.centroids @ query, nprobe)
+        rows = np.concatenate(
+            [
+                np.arange(self.list_offsets[i], self.list_offsets[i + 1])
+                for i in lists
+            ]
+        )
+        scores = np.concatenate(
+            [
+                self.vectors[self.list_offsets[i] : self.list_offsets[i + 1]] @ query
+                for i in lists
+            ]
+        )
+        best = _top_k(scores, k)
+        return rows[best], scores[best]
+
+    def search_exact(self, query, k, block_rows=65536):
+        # Brute force over every row, block by block, keeping a running top k.
+        rows = np.empty(0, dtype=np.int64)
+        scores = np.empty(0, dtype=np.float32)
+        for start in range(0, len(self.vectors), block_rows):
+            block = self.vectors[start : start + block_rows] @ query
+            rows = np.concatenate([rows, np.arange(start, start + len(block))])
+            scores = np.concatenate([scores, block])
+            best = _top_k(scores, k)
+            rows, scores = rows[best], scores[best]
+        return rows, scores
+
+
+class SimilarityService:
+    # Holds the PaperIndex for the current embeddings and corpus, reopened
+    # when either is rebuilt. An index built from an older corpus is not
+    # served, since its record ids would point at the wrong papers.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = (None, None)
+
+    def _paths(self):
+        return (
+            sample_data.ARTIFACTS_DIR / "embeddings",
+            sample_data.DATA_DIR / "corpus",
+        )
+
+    def get(self):
+        embeddings_dir, corpus_dir = self._paths()
+        version = (
+            artifact_cache.version(embeddings_dir / "meta.json"),
+            artifact_cache.version(corpus_dir / "meta.json"),
+        )
+        if None in version:
+            return None
+        current_version, index = self._current
+        if current_version == version:
+            return index
+        with self._lock:
+            if self._current[0] != version:
+                self._current = (version, self._open(embeddings_dir, corpus_dir))
+            return self._current[1]
+
+    def _open(self, embeddings_dir, corpus_dir):
+        try:
+            index = PaperIndex(embeddings_dir, corpus_dir)
+        except (OSError, ValueError, KeyError):
+            return None
+        if index.meta.get("format") != EMBEDDINGS_FORMAT:
+            return None
+        if index.meta.get("corpus") != index.corpus_digest:
+            return None
+        return index
+
+
+similarity = SimilarityService()
+
+
+def similar_papers(paper=None, text=None, k=10, nprobe=8, exact=False):
+    # Raises FileNotFoundError without a usable index, LookupError for an
+    # unknown paper and ValueError when a text query cannot be encoded or has
+    # no known terms.
+    index = similarity.get()
+    if index is None:
+        raise FileNotFoundError("No embedding index. Run training/build_embeddings.py.")
+    if paper is not None:
+        if not 0 <= paper < len(index):
+            raise LookupError(f"Unknown paper {paper}.")
+        query = index.vector(paper)
+        # One extra neighbour, since the paper finds itself first.
+        wanted = k + 1
+    else:
+        query = index.encode(text)
+        if query is None:
+            raise ValueError("Text queries need a TF-IDF embedding index.")
+        wanted = k
+
+    with stage_latency.time("similar_search"):
+        if exact:
+            rows, scores = index.search_exact(query, wanted)
+        else:
+            rows, scores = index.search(query, wanted, nprobe)
+    neighbors = [
+        {**index.paper(int(index.ids[row])), "score": float(score)}
+        for row, score in zip(rows, scores)
+    ]
+    if paper is not None:
+        neighbors = [n for n in neighbors if n["id"] != paper][:k]
+    return {
+        "query": index.paper(paper) if paper is not None else None,
+        "method": "exact" if exact else "ivf",
+        "neighbors": neighbors,
+    }
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from backend.app.schemas import SECTION_SCHEMAS
+from backend.app.services import sample_data
+from backend.app.services.artifact_cache import artifact_cache
+from backend.app.services.metrics import stage_latency
+from backend.app.services.serialization import dumps
+
+
+SNAPSHOT_NAME = "dashboard_snapshot.json"
+SNAPSHOT_FORMAT = 2
+
+
+def _source_versions():
+    # (mtime, size) of every artifact the snapshot is derived from. A
+    # snapshot whose recorded versions differ is stale and is not served.
+    paths = [
+        *sample_data._dashboard_artifacts(),
+        sample_data.ARTIFACTS_DIR / "data_quality.json",
+    ]
+    versions = {}
+    for path in paths:
+        version = artifact_cache.version(path)
+        versions[f"{path.parent.name}/{path.name}"] = list(version) if version else None
+    return versions
+
+
+def _encode(payload):
+    with stage_latency.time("serialize"):
+        return dumps(payload)
+
+
+def build_snapshot():
+    # Runs every derived computation once, at training time, so the API only
+    # has to hand out bytes. Sources are stat'ed first, so a file rewritten
+    # during the build leaves the snapshot stale rather than wrong.
+    sources = _source_versions()
+    sections = sample_data.get_dashboard()
+    sections["data_quality"] = sample_data.get_data_quality()
+    # Validated here so serving the snapshot needs no per-request checks.
+    for name, section in sections.items():
+        SECTION_SCHEMAS[name].validate_python(section)
+    version = hashlib.sha1(_encode(sections)).hexdigest()[:20]
+    document = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "sources": sources,
+        "sections": sections,
+    }
+
+    path = sample_data.ARTIFACTS_DIR / SNAPSHOT_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Readers only ever see the old or the new file, never a partial one.
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(_encode(document))
+    os.replace(tmp_path, path)
+    return document
+
+
+class Snapshot:
+    def __init__(self, file_version, document):
+        self.file_version = file_version
+        self.sources = document["sources"]
+        self.version = document["version"]
+        self.etag = f'"{document["version"]}"'
+        self.sections = {
+            name: _encode(section) for name, section in document["sections"].items()
+        }
+        self.body = _encode(document["sections"])
+
+
+class SnapshotStore:
+    # Holds the current snapshot, pre-serialized. A rewrite of the snapshot
+    # file is picked up on the next request and swapped in by rebinding a
+    # single reference, so concurrent readers keep whichever one they hold.
+    # Once any source artifact changes after the build, get() returns None
+    # and callers compute live until the snapshot is rebuilt.
+    def __init__(self):
+        self._current = None
+        self._lock = threading.Lock()
+        # DASHBOARD_SNAPSHOT=0 serves everything live, e.g. to benchmark the
+        # artifact path.
+        self.enabled = os.environ.get("DASHBOARD_SNAPSHOT", "1") != "0"
+
+    def get(self):
+        if not self.enabled:
+            return None
+        current = self._load()
+        if current is None or current.sources != _source_versions():
+            return None
+        return current
+
+    def _load(self):
+        path = sample_data.ARTIFACTS_DIR / SNAPSHOT_NAME
+        version = artifact_cache.version(path)
+        current = self._current
+        if version is None:
+            return None
+        if current is not None and current.file_version == version:
+            return current
+        with self._lock:
+            current = self._current
+            if current is None or current.file_version != version:
+                try:
+                    with stage_latency.time("artifact_io"):
+                        raw = path.read_bytes()
+                    with stage_latency.time("json_decode"):
+                        document = json.loads(raw)
+                except (OSError, json.JSONDecodeError):
+                    return current
+                if document.get("format") != SNAPSHOT_FORMAT:
+                    return None
+                current = Snapshot(version, document)
+                self._current = current
+        return current
+
+
+snapshot_store = SnapshotStore()
+
+
+def main():
+    document = build_snapshot()
+    print(f"Wrote dashboard snapshot {document['version']}.")
+
+
+if __name__ == "__main__":
+    main()
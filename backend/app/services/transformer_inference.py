@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+
+from backend.app.services import sample_data
+from backend.app.services.inference import MicroBatcher, format_predictions
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+class TransformerService:
+    # CPU inference for the SciBERT classifier saved by
+    # training/train_transformer.py. Requests go through a MicroBatcher; each
+    # dynamic batch is then sorted by token length and split into buckets that
+    # are padded only to their own longest sequence.
+    name = "scibert"
+
+    def __init__(
+        self,
+        dirname="hf_model",
+        max_batch=None,
+        max_wait_ms=None,
+        bucket_size=None,
+        max_length=None,
+        threads=None,
+        quantize=None,
+    ):
+        self.dirname = dirname
+        self.bucket_size = bucket_size or _env_int("TRANSFORMER_BUCKET_SIZE", 16)
+        self.max_length = max_length or _env_int("TRANSFORMER_MAX_LENGTH", 256)
+        self.threads = threads or _env_int("TRANSFORMER_THREADS", os.cpu_count() or 1)
+        if quantize is None:
+            quantize = os.environ.get("TRANSFORMER_QUANTIZE", "") == "1"
+        self.quantize = quantize
+        self.model = None
+        self.tokenizer = None
+        self.batcher = MicroBatcher(
+            self.predict_batch,
+            max_batch=max_batch or _env_int("TRANSFORMER_MAX_BATCH", 32),
+            max_wait=(
+                max_wait_ms
+                if max_wait_ms is not None
+                else _env_int("TRANSFORMER_MAX_WAIT_MS", 10)
+            )
+            / 1000,
+        )
+
+    @property
+    def ready(self):
+        return self.model is not None
+
+    def load(self):
+        model_dir = sample_data.ARTIFACTS_DIR / self.dirname
+        if not (model_dir / "config.json").exists():
+            return False
+        try:
+            import torch
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        except ImportError:
+            return False
+
+        torch.set_num_threads(self.threads)
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+        model.eval()
+        if self.quantize:
+            # int8 weights for every Linear layer; activations stay float.
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        self._torch = torch
+        self.tokenizer = tokenizer
+        self.model = model
+        self.classes = [
+            str(model.config.id2label[i]) for i in range(model.config.num_labels)
+        ]
+        self.predict_batch(["warm up"])
+        self.batcher.start()
+        return True
+
+    def close(self):
+        self.batcher.stop()
+
+    def predict_batch(self, texts):
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+
+        probabilities = np.empty((len(texts), len(self.classes)), dtype=np.float32)
+        with self._torch.inference_mode():
+            for start in range(0, len(order), self.bucket_size):
+                bucket = order[start : start + self.bucket_size]
+                features = self.tokenizer.pad(
+                    {key: [rows[i] for i in bucket] for key, rows in encodings.items()},
+                    return_tensors="pt",
+                )
+                logits = self.model(**features).logits
+                probabilities[bucket] = self._torch.softmax(logits, dim=-1).numpy()
+        return format_predictions(self.classes, probabilities)
+
+    def submit(self, texts):
+        return self.batcher.submit(texts)
+
+
+transformer = TransformerService()
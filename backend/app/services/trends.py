@@ -0,0 +1,131 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+import numpy as np
+
+
+GRANULARITIES = ("day", "week", "month")
+# Layout of data/processed/trend_index.json. training/preprocess_arxiv.py
+# writes this value and the API ignores any other, so bump it on changes.
+TREND_FORMAT = 2
+
+
+def bucket_key(day, granularity):
+    # Maps an ISO date onto the bucket naming used by training/preprocess_arxiv.
+    if granularity == "month":
+        return day.isoformat()[:7]
+    if granularity == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.isoformat()
+
+
+def bucket_end(key, granularity):
+    # Last day covered by a bucket key from bucket_key().
+    if granularity == "month":
+        year, month = int(key[:4]), int(key[5:7])
+        first_of_next = date(year + month // 12, month % 12 + 1, 1)
+        return first_of_next - timedelta(days=1)
+    if granularity == "week":
+        year, week = key.split("-W")
+        return date.fromisocalendar(int(year), int(week), 7)
+    return date.fromisoformat(key)
+
+
+def bucket_start(key, granularity):
+    # First day covered by a bucket key from bucket_key().
+    if granularity == "month":
+        return date(int(key[:4]), int(key[5:7]), 1)
+    if granularity == "week":
+        year, week = key.split("-W")
+        return date.fromisocalendar(int(year), int(week), 1)
+    return date.fromisoformat(key)
+
+
+def bucket_range(first, last, granularity):
+    # Every bucket key from first to last inclusive, including the ones no
+    # paper falls into.
+    keys = []
+    day = bucket_start(first, granularity)
+    while True:
+        key = bucket_key(day, granularity)
+        keys.append(key)
+        if key == last:
+            return keys
+        day = bucket_end(key, granularity) + timedelta(days=1)
+
+
+class TrendIndex:
+    # In-memory form of data/processed/trend_index.json: per granularity, the
+    # sorted bucket keys and a labels x buckets count matrix plus its column
+    # totals. Queries are a bisect on the keys and a slice of one row. The
+    # keys have no gaps, so periods=N is N calendar periods.
+    def __init__(self, document):
+        self.labels = document["labels"]
+        self.rows = {label: i for i, label in enumerate(self.labels)}
+        self.levels = {}
+        for granularity in GRANULARITIES:
+            level = document[granularity]
+            counts = np.array(
+                [level["counts"][label] for label in self.labels], dtype=np.int64
+            ).reshape(len(self.labels), len(level["buckets"]))
+            self.levels[granularity] = (level["buckets"], counts, counts.sum(axis=0))
+        day_buckets = self.levels["day"][0]
+        # The newest publication day stands in for "data as of".
+        self.latest_day = date.fromisoformat(day_buckets[-1]) if day_buckets else None
+
+    def complete_count(self, granularity):
+        # Buckets up to and including the last one that ends on or before
+        # latest_day; a trailing bucket still in progress is left out.
+        buckets = self.levels[granularity][0]
+        if buckets and bucket_end(buckets[-1], granularity) > self.latest_day:
+            return len(buckets) - 1
+        return len(buckets)
+
+    def query(
+        self,
+        granularity="month",
+        start=None,
+        end=None,
+        label=None,
+        periods=None,
+        include_partial=False,
+    ):
+        # Without an explicit end, a trailing bucket still in progress is
+        # left out; it would otherwise end every chart in a false drop.
+        buckets, counts, totals = self.levels[granularity]
+        if label is None:
+            row = totals
+        elif label in self.rows:
+            row = counts[self.rows[label]]
+        else:
+            row = np.zeros(len(buckets), dtype=np.int64)
+
+        lo = bisect_left(buckets, bucket_key(start, granularity)) if start else 0
+        hi = len(buckets)
+        if end:
+            hi = bisect_right(buckets, bucket_key(end, granularity))
+        elif not include_partial:
+            hi = self.complete_count(granularity)
+        if periods and start is None:
+            lo = max(lo, hi - periods)
+        values = row[lo:hi].tolist()
+        return [{"period": buckets[lo + i], "value": v} for i, v in enumerate(values)]
+
+
+_lock = threading.Lock()
+_current = (None, None)
+
+
+def trend_index_for(document):
+    # The artifact cache hands back the same document object until the file
+    # changes, so the derived index is rebuilt only once per new version.
+    global _current
+    source, index = _current
+    if source is document:
+        return index
+    with _lock:
+        if _current[0] is not document:
+            _current = (document, TrendIndex(document))
+        return _current[1]
@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+# Usage, from the repo root:
+#   python -m backend.benchmark [--mode uvicorn] [--scenarios artifacts,snapshot]
+#   python backend/benchmark.py ...
+# Scenarios: "artifacts" serves every panel from the artifact files with the
+# dashboard snapshot disabled, "snapshot" the same files through the
+# pre-serialized snapshot, "fallback" empty directories (built-in data).
+if __package__ in (None, ""):
+    # Run as a script: make the `backend` package importable.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+# What one dashboard load costs: the five parallel panel fetches the UI used
+# to issue, followed by a weekly report.
+FANOUT_ROUTES = [
+    "/analytics/kpis",
+    "/analytics/entity-distribution",
+    "/analytics/radar-metrics",
+    "/analytics/trend-series",
+    "/analytics/insights",
+]
+REPORT_ROUTE = "/analytics/weekly-report"
+WORKLOADS = {
+    "fanout": (FANOUT_ROUTES, [REPORT_ROUTE]),
+    "batched": (["/analytics/dashboard"], [REPORT_ROUTE]),
+}
+
+
+async def _timed_get(client, route, samples, errors):
+    start = time.perf_counter()
+    try:
+        response = await client.get(route)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    elapsed = time.perf_counter() - start
+    if ok:
+        samples.setdefault(route, []).append(elapsed)
+    else:
+        errors[route] = errors.get(route, 0) + 1
+
+
+async def _virtual_user(client, workload, deadline, samples, errors):
+    parallel, sequential = workload
+    while time.perf_counter() < deadline:
+        await asyncio.gather(
+            *[_timed_get(client, route, samples, errors) for route in parallel]
+        )
+        for route in sequential:
+            await _timed_get(client, route, samples, errors)
+
+
+def summarize(samples, errors):
+    routes = {}
+    for route in sorted(set(samples) | set(errors)):
+        latencies = np.asarray(samples.get(route, []), dtype=np.float64) * 1000
+        stats = {"count": int(latencies.size), "errors": errors.get(route, 0)}
+        if latencies.size:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            stats.update(
+                mean_ms=float(latencies.mean()),
+                p50_ms=float(p50),
+                p95_ms=float(p95),
+                p99_ms=float(p99),
+                max_ms=float(latencies.max()),
+            )
+        routes[route] = stats
+    return routes
+
+
+async def run_level(client, workload, concurrency, duration, warmup):
+    if warmup:
+        await _virtual_user(client, workload, time.perf_counter() + warmup, {}, {})
+    samples, errors = {}, {}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *[
+            _virtual_user(client, workload, deadline, samples, errors)
+            for _ in range(concurrency)
+        ]
+    )
+    elapsed = time.perf_counter() - started
+    total = sum(len(v) for v in samples.values()) + sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "requests": total,
+        "throughput_rps": total / elapsed,
+        "routes": summarize(samples, errors),
+    }
+
+
+def _reset_in_process_state(artifacts_dir, data_dir, use_snapshot):
+    # Both services resolve their paths through sample_data on every call, so
+    # pointing it elsewhere and dropping the caches switches scenario.
+    from backend.app.services import sample_data
+    from backend.app.services.artifact_cache import artifact_cache
+    from backend.app.services.snapshot import snapshot_store
+
+    sample_data.ARTIFACTS_DIR = Path(artifacts_dir)
+    sample_data.DATA_DIR = Path(data_dir)
+    artifact_cache.clear()
+    snapshot_store._current = None
+    snapshot_store.enabled = use_snapshot
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_uvicorn(artifacts_dir, data_dir, use_snapshot):
+    port = _free_port()
+    env = dict(
+        os.environ,
+        ARTIFACTS_DIR=artifacts_dir,
+        PROCESSED_DATA_DIR=data_dir,
+        DASHBOARD_SNAPSHOT="1" if use_snapshot else "0",
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "backend.app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy")
+
+
+async def run_scenario(args, scenario, artifacts_dir, data_dir):
+    # With --url the server's own configuration decides; the scenario is
+    # only a label then.
+    use_snapshot = scenario == "snapshot"
+    process = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url)
+    elif args.mode == "uvicorn":
+        process, url = _start_uvicorn(artifacts_dir, data_dir, use_snapshot)
+        limits = httpx.Limits(max_connections=max(args.concurrency) * 8)
+        client = httpx.AsyncClient(base_url=url, limits=limits)
+    else:
+        from backend.app.main import app
+
+        _reset_in_process_state(artifacts_dir, data_dir, use_snapshot)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        )
+
+    runs = []
+    try:
+        async with client:
+            for concurrency in args.concurrency:
+                result = await run_level(
+                    client,
+                    WORKLOADS[args.workload],
+                    concurrency,
+                    args.duration,
+                    args.warmup,
+                )
+                result["scenario"] = scenario
+                runs.append(result)
+                print_run(result)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    return runs
+
+
+def print_run(result):
+    print(
+        f"\n[{result['scenario']}] concurrency={result['concurrency']} "
+        f"requests={result['requests']} rps={result['throughput_rps']:.1f}"
+    )
+    for route, stats in result["routes"].items():
+        if not stats["count"]:
+            print(f"  {route:<36} errors={stats['errors']}")
+            continue
+        print(
+            f"  {route:<36} p50={stats['p50_ms']:7.2f}ms "
+            f"p95={stats['p95_ms']:7.2f}ms p99={stats['p99_ms']:7.2f}ms "
+            f"errors={stats['errors']}"
+        )
+
+
+def compare(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["runs"]}
+    print(f"\nCompared with {baseline_path}:")
+    for run in results["runs"]:
+        before = previous.get((run["scenario"], run["concurrency"]))
+        if before is None:
+            continue
+        change = run["throughput_rps"] / before["throughput_rps"] - 1
+        print(
+            f"  [{run['scenario']}] c={run['concurrency']} rps {change:+.1%}",
+            end="",
+        )
+        for route, stats in run["routes"].items():
+            old = before["routes"].get(route, {})
+            if "p99_ms" in stats and "p99_ms" in old:
+                print(f" | {route.rsplit('/', 1)[-1]} p99 "
+                      f"{stats['p99_ms'] / old['p99_ms'] - 1:+.1%}", end="")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay dashboard traffic against the API and report latency."
+    )
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--url", help="Benchmark an already running server instead.")
+    parser.add_argument(
+        "--workload", choices=sorted(WORKLOADS), default="fanout"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[1, 8, 32],
+        help="Comma-separated virtual user counts.",
+    )
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument(
+        "--scenarios",
+        type=lambda v: v.split(","),
+        default=["artifacts", "snapshot", "fallback"],
+        help="artifacts: artifact files, snapshot disabled; snapshot: the same "
+        "through the dashboard snapshot; fallback: empty dirs.",
+    )
+    parser.add_argument("--artifacts-dir", default=None)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--baseline", help="Earlier results file to compare with.")
+    args = parser.parse_args()
+
+    from backend.app.services import sample_data
+
+    artifacts_dir = args.artifacts_dir or str(sample_data.ARTIFACTS_DIR)
+    data_dir = args.data_dir or str(sample_data.DATA_DIR)
+
+    runs = []
+    with tempfile.TemporaryDirectory() as empty_dir:
+        for scenario in args.scenarios:
+            if scenario == "fallback":
+                dirs = (empty_dir, empty_dir)
+            else:
+                dirs = (artifacts_dir, data_dir)
+            runs.extend(asyncio.run(run_scenario(args, scenario, *dirs)))
+
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "mode": "url" if args.url else args.mode,
+            "workload": args.workload,
+            "duration_s": args.duration,
+            "python": sys.version.split()[0],
+            "cpus": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+    out = Path(
+        args.out
+        or f"artifacts/benchmarks/api-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\nSaved results to {out}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,12 +26,12 @@ const FALLBACK = {
     { metric: "Drift", value: 0.18 },
   ],
   trend: [
-    { month: "Jan", value: 62 },
-    { month: "Feb", value: 68 },
-    { month: "Mar", value: 74 },
-    { month: "Apr", value: 71 },
-    { month: "May", value: 79 },
-    { month: "Jun", value: 85 },
+    { period: "Jan", value: 62 },
+    { period: "Feb", value: 68 },
+    { period: "Mar", value: 74 },
+    { period: "Apr", value: 71 },
+    { period: "May", value: 79 },
+    { period: "Jun", value: 85 },
   ],
   insights: {
     total_records: 10000,
@@ -55,21 +55,42 @@ export default function App() {
   const [insights, setInsights] = useState(FALLBACK.insights);
 
   useEffect(() => {
-    Promise.all([
-      fetch(`${API}/kpis`).then((r) => r.json()),
-      fetch(`${API}/entity-distribution`).then((r) => r.json()),
-      fetch(`${API}/radar-metrics`).then((r) => r.json()),
-      fetch(`${API}/trend-series`).then((r) => r.json()),
-      fetch(`${API}/insights`).then((r) => r.json()),
-    ])
-      .then(([k, d, r, t, i]) => {
-        setKpis(k);
-        setDistribution(d);
-        setRadar(r);
-        setTrend(t);
-        setInsights(i);
+    const setters = {
+      kpis: setKpis,
+      distribution: setDistribution,
+      radar: setRadar,
+      trend: setTrend,
+      insights: setInsights,
+    };
+    const apply = (sections) => {
+      Object.entries(sections).forEach(([name, value]) => setters[name]?.(value));
+    };
+
+    // The REST payload is loaded on mount as well, so the page fills in even
+    // when a proxy buffers or blocks the stream. It is dropped if the stream
+    // has already delivered something newer.
+    let streamed = false;
+    fetch(`${API}/dashboard`)
+      .then((r) => r.json())
+      .then((sections) => {
+        if (!streamed) apply(sections);
       })
       .catch(() => null);
+
+    if (typeof EventSource === "undefined") {
+      return undefined;
+    }
+
+    // The server sends the full dashboard first, then only the sections that
+    // changed when new artifacts land; the browser reconnects on its own.
+    const source = new EventSource(`${API}/stream`);
+    const onMessage = (event) => {
+      streamed = true;
+      apply(JSON.parse(event.data).sections);
+    };
+    source.addEventListener("snapshot", onMessage);
+    source.addEventListener("update", onMessage);
+    return () => source.close();
   }, []);
 
   const scoreCards = useMemo(
@@ -22,7 +22,7 @@ export default function TrendChart({ data }) {
             </linearGradient>
           </defs>
           <CartesianGrid strokeDasharray="3 3" />
-          <XAxis dataKey="month" />
+          <XAxis dataKey="period" />
           <YAxis />
           <Tooltip />
           <Area
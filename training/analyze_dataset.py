@@ -1,65 +1,184 @@
 import argparse
 import json
 import re
-from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from pathlib import Path
 
+import numpy as np
 from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
 
+from corpus import load_corpus
+
 
 TOKEN_RE = re.compile(r"[a-zA-Z][a-zA-Z0-9_+-]{2,}")
+# Token positions are encoded as chunk_index << CHUNK_SHIFT | position so that
+# chunks counted in different processes still order globally.
+CHUNK_SHIFT = 40
+
+_worker_corpus = None
+
+
+def count_terms(texts, codes):
+    # Sparse (label, term) counts for one chunk of documents. Besides the
+    # count, each pair keeps the position of its first token so ties can be
+    # broken in first-seen order, exactly like Counter.most_common.
+    docs = [TOKEN_RE.findall(text.lower()) for text in texts]
+    tokens = list(chain.from_iterable(docs))
+    vocab = list(dict.fromkeys(tokens))
+    if not vocab:
+        empty = np.empty(0, dtype=np.int64)
+        return vocab, empty, empty, empty, empty
+
+    index = {term: i for i, term in enumerate(vocab)}
+    term_ids = np.fromiter(
+        map(index.__getitem__, tokens), dtype=np.int64, count=len(tokens)
+    )
+    lengths = np.fromiter(map(len, docs), dtype=np.int64, count=len(docs))
+    token_labels = np.repeat(np.asarray(codes, dtype=np.int64), lengths)
+    is_stop = np.fromiter(
+        (term in ENGLISH_STOP_WORDS for term in vocab), dtype=bool, count=len(vocab)
+    )
+    keep = np.flatnonzero(~is_stop[term_ids])
+
+    keys = token_labels[keep] * len(vocab) + term_ids[keep]
+    pair_keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    return vocab, pair_keys // len(vocab), pair_keys % len(vocab), counts, keep[first]
+
+
+def _count_chunk(indices):
+    global _worker_corpus
+    if _worker_corpus is None:
+        _worker_corpus = load_corpus()
+    return count_terms(
+        _worker_corpus.iter_texts(indices), _worker_corpus.label_codes[indices]
+    )
+
+
+def _reduce(keys, counts, first):
+    if not len(keys):
+        return keys, counts, first
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return (
+        keys[starts],
+        np.add.reduceat(counts[order], starts),
+        np.minimum.reduceat(first[order], starts),
+    )
 
 
-def load_samples():
-    data_path = Path("data/processed/papers.jsonl")
-    if not data_path.exists():
-        raise FileNotFoundError(
-            "Missing data/processed/papers.jsonl. Run preprocessing first."
+def merge_chunks(chunks):
+    # Maps each chunk's local vocabulary onto a global one and sums the
+    # (label, term) pairs into a label x term sparse matrix in CSR order.
+    vocab = {}
+    labels, terms, counts, first = [], [], [], []
+    for chunk_index, chunk in enumerate(chunks):
+        chunk_vocab, c_labels, c_terms, c_counts, c_first = chunk
+        remap = np.fromiter(
+            (vocab.setdefault(term, len(vocab)) for term in chunk_vocab),
+            dtype=np.int64,
+            count=len(chunk_vocab),
+        )
+        labels.append(c_labels)
+        terms.append(remap[c_terms])
+        counts.append(c_counts)
+        first.append(c_first + (chunk_index << CHUNK_SHIFT))
+
+    size = max(len(vocab), 1)
+    keys, counts, first = _reduce(
+        np.concatenate(labels) * size + np.concatenate(terms),
+        np.concatenate(counts),
+        np.concatenate(first),
+    )
+    vocab = np.asarray(list(vocab), dtype=object)
+    return vocab, keys // size, keys % size, counts, first
+
+
+def top_terms(vocab, terms, counts, first, k):
+    order = np.lexsort((first, -counts))[:k]
+    return vocab[terms[order]].tolist()
+
+
+def select_documents(codes, max_per_label):
+    # Keeps the first `max_per_label` documents of every label (0 keeps all).
+    if max_per_label <= 0:
+        return np.arange(len(codes))
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(codes)])
+    rank = np.arange(len(codes)) - np.repeat(group_starts, group_sizes)
+    return np.sort(order[rank < max_per_label])
+
+
+def label_term_stats(corpus, max_per_label, top_k, chunk_size=5000, workers=1):
+    codes = np.asarray(corpus.label_codes)
+    selected = select_documents(codes, max_per_label)
+    chunks = [
+        selected[start : start + chunk_size]
+        for start in range(0, len(selected), chunk_size)
+    ]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_count_chunk, chunks))
+    else:
+        results = [
+            count_terms(corpus.iter_texts(chunk), codes[chunk]) for chunk in chunks
+        ]
+    if not results:
+        return [], {}
+    vocab, labels, terms, counts, first = merge_chunks(results)
+
+    global_terms, global_counts, global_first = _reduce(terms, counts, first)
+    top_global = top_terms(vocab, global_terms, global_counts, global_first, top_k)
+
+    label_starts = np.searchsorted(labels, np.arange(len(corpus.label_names) + 1))
+    _, first_docs = np.unique(codes[selected], return_index=True)
+    top_by_label = {}
+    for code in codes[selected][np.sort(first_docs)]:
+        lo, hi = label_starts[code], label_starts[code + 1]
+        top_by_label[corpus.label_names[code]] = top_terms(
+            vocab, terms[lo:hi], counts[lo:hi], first[lo:hi], top_k
         )
-    samples = []
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            samples.append(json.loads(line))
-    return samples
+    return top_global, top_by_label
 
 
-def tokenize(text):
-    tokens = TOKEN_RE.findall(text.lower())
-    return [t for t in tokens if t not in ENGLISH_STOP_WORDS]
+def top_labels(corpus, n=10):
+    codes = np.asarray(corpus.label_codes)
+    present, first_seen, counts = np.unique(
+        codes, return_index=True, return_counts=True
+    )
+    order = np.lexsort((first_seen, -counts))[:n]
+    return [[corpus.label_names[present[i]], int(counts[i])] for i in order]
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--top-terms", type=int, default=12)
-    parser.add_argument("--max-per-label", type=int, default=2000)
+    parser.add_argument(
+        "--max-per-label",
+        type=int,
+        default=2000,
+        help="Documents per label used for term stats; 0 uses the full corpus.",
+    )
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1)
     args = parser.parse_args()
 
-    samples = load_samples()
-    label_counts = Counter()
-    global_counts = Counter()
-    label_term_counts = defaultdict(Counter)
-
-    per_label_seen = Counter()
-    for sample in samples:
-        label = sample["label"]
-        label_counts[label] += 1
-        if per_label_seen[label] >= args.max_per_label:
-            continue
-        per_label_seen[label] += 1
-        tokens = tokenize(sample["text"])
-        global_counts.update(tokens)
-        label_term_counts[label].update(tokens)
-
-    top_global = [t for t, _ in global_counts.most_common(args.top_terms)]
-    top_by_label = {
-        label: [t for t, _ in counts.most_common(args.top_terms)]
-        for label, counts in label_term_counts.items()
-    }
+    corpus = load_corpus()
+    top_global, top_by_label = label_term_stats(
+        corpus,
+        args.max_per_label,
+        args.top_terms,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+    )
 
     insights = {
-        "total_records": sum(label_counts.values()),
-        "unique_labels": len(label_counts),
-        "top_labels": label_counts.most_common(10),
+        "total_records": len(corpus),
+        "unique_labels": len(np.unique(corpus.label_codes)),
+        "top_labels": top_labels(corpus),
         "top_terms_global": top_global,
         "top_terms_by_label": top_by_label,
     }
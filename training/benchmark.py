@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+TRAINING_DIR = Path(__file__).resolve().parent
+STAGES = [
+    ("preprocess", "preprocess_arxiv.py"),
+    ("analyze", "analyze_dataset.py"),
+    ("train_classifier", "train_classifier.py"),
+    ("evaluate", "evaluate.py"),
+]
+LABELS = [
+    "cs.AI", "cs.LG", "cs.CL", "cs.CV", "cs.RO", "cs.CR",
+    "cs.IR", "cs.NE", "cs.DS", "cs.SE", "q-bio.QM", "stat.ML",
+]
+COMMON_WORDS = (
+    "model data method results approach paper propose show performance task "
+    "based using framework novel analysis learning evaluation study problem"
+).split()
+ENTRIES_PER_FILE = 10000
+FEED_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    "  <title>ArXiv Query: synthetic benchmark corpus</title>\n"
+)
+
+
+def _label_vocab(rng):
+    # A few hundred words per label, overlapping with the common pool, so the
+    # classifier and the term statistics have realistic work to do.
+    return {
+        label: [f"{label.split('.')[-1].lower()}{i}" for i in range(200)]
+        + rng.sample(COMMON_WORDS, 10)
+        for label in LABELS
+    }
+
+
+def _entry(rng, vocab, index, start_day):
+    # Label frequencies are skewed like the real feed: a few large
+    # categories and a long tail.
+    label = LABELS[min(int(rng.paretovariate(1.2)) - 1, len(LABELS) - 1)]
+    words = vocab[label]
+    title = " ".join(rng.choices(words, k=rng.randint(4, 10)))
+    summary = " ".join(
+        rng.choice(words) if rng.random() < 0.4 else rng.choice(COMMON_WORDS)
+        for _ in range(rng.randint(40, 160))
+    )
+    published = start_day + timedelta(days=rng.randrange(365))
+    # A small share of entries without an abstract, which preprocessing drops.
+    if rng.random() < 0.01:
+        summary = ""
+    return (
+        "  <entry>\n"
+        f"    <id>http://arxiv.org/abs/bench.{index:07d}v1</id>\n"
+        f"    <published>{published.isoformat()}T10:00:00Z</published>\n"
+        f"    <title>{escape(title)}</title>\n"
+        f"    <summary>{escape(summary)}</summary>\n"
+        f'    <category term="{label}" scheme="http://arxiv.org/schemas/atom"/>\n'
+        "  </entry>\n"
+    )
+
+
+def generate_corpus(raw_dir, entries, seed=42):
+    # Writes data/raw/arxiv_*.xml in the layout ingest_arxiv.py produces.
+    rng = random.Random(seed)
+    vocab = _label_vocab(rng)
+    start_day = date(2025, 1, 1)
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    for file_index, offset in enumerate(range(0, entries, ENTRIES_PER_FILE)):
+        count = min(ENTRIES_PER_FILE, entries - offset)
+        with (raw_dir / f"arxiv_{file_index:05d}.xml").open(
+            "w", encoding="utf-8"
+        ) as f:
+            f.write(FEED_HEADER)
+            for i in range(count):
+                f.write(_entry(rng, vocab, offset + i, start_day))
+            f.write("</feed>\n")
+
+
+def count_lines(path):
+    with path.open("rb") as f:
+        return sum(1 for _ in f)
+
+
+def run_stage(script, extra_args, work_dir):
+    # os.wait4 returns the child's own resource usage, so peak RSS is the
+    # stage's and not the benchmark driver's. It is POSIX-only; elsewhere
+    # (Windows) only wall time is measured and peak RSS is None.
+    command = [sys.executable, str(TRAINING_DIR / script), *extra_args]
+    # stderr goes to a file: a pipe nobody reads until exit could fill up.
+    with tempfile.TemporaryFile() as stderr:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            command, cwd=work_dir, stdout=subprocess.DEVNULL, stderr=stderr
+        )
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            process.wait()
+            usage = None
+        wall = time.perf_counter() - started
+        if process.returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", "replace")
+            raise RuntimeError(f"{script} failed ({process.returncode}):\n{message}")
+    if usage is None:
+        return wall, None
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return wall, usage.ru_maxrss * scale
+
+
+def benchmark_size(size, stage_args, repeat, keep):
+    work_dir = Path(tempfile.mkdtemp(prefix=f"training-bench-{size}-"))
+    try:
+        started = time.perf_counter()
+        generate_corpus(work_dir / "data" / "raw", size)
+        print(f"[{size}] generated corpus in {time.perf_counter() - started:.1f}s")
+
+        results = []
+        for stage, script in STAGES:
+            runs = [
+                run_stage(script, stage_args[stage], work_dir) for _ in range(repeat)
+            ]
+            wall = min(wall for wall, _ in runs)
+            rss = [rss for _, rss in runs if rss is not None]
+            peak_rss = max(rss) if rss else None
+            records = (
+                size
+                if stage == "preprocess"
+                else count_lines(work_dir / "data" / "processed" / "papers.jsonl")
+            )
+            result = {
+                "size": size,
+                "stage": stage,
+                "args": stage_args[stage],
+                "wall_s": wall,
+                "peak_rss_mb": peak_rss / 2**20 if peak_rss is not None else None,
+                "records": records,
+                "records_per_s": records / wall if wall else None,
+            }
+            results.append(result)
+            memory = (
+                f"{result['peak_rss_mb']:8.1f} MiB"
+                if peak_rss is not None
+                else "     n/a MiB"
+            )
+            print(
+                f"[{size}] {stage:<17} {wall:8.2f}s "
+                f"{memory} {result['records_per_s']:10.0f} rec/s"
+            )
+        return results
+    finally:
+        if keep:
+            print(f"[{size}] kept {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def find_regressions(results, baseline, threshold, rss_threshold):
+    previous = {(r["size"], r["stage"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["size"], result["stage"]))
+        if before is None:
+            continue
+        name = f"{result['stage']} @ {result['size']}"
+        if result["wall_s"] > before["wall_s"] * (1 + threshold):
+            regressions.append(
+                f"{name}: wall {before['wall_s']:.2f}s -> {result['wall_s']:.2f}s"
+            )
+        if result["peak_rss_mb"] is None or before["peak_rss_mb"] is None:
+            continue
+        if result["peak_rss_mb"] > before["peak_rss_mb"] * (1 + rss_threshold):
+            regressions.append(
+                f"{name}: peak RSS {before['peak_rss_mb']:.1f} -> "
+                f"{result['peak_rss_mb']:.1f} MiB"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the training pipeline on synthetic Atom corpora. Peak "
+        "memory is measured on Linux and macOS only; on Windows results hold wall "
+        "time and peak_rss_mb is null."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[1000, 10000, 100000],
+        help="Comma-separated entry counts, e.g. 1000,10000,100000,1000000.",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Keep the fastest of N.")
+    for stage, _ in STAGES:
+        parser.add_argument(
+            f"--{stage.replace('_', '-')}-args",
+            default="",
+            help=f"Extra arguments for the {stage} stage; pass with '=', "
+            "e.g. --preprocess-args='--workers 4'.",
+        )
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--baseline", help="Results file to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed wall-time slowdown against the baseline (0.2 = 20%%).",
+    )
+    parser.add_argument("--rss-threshold", type=float, default=0.2)
+    parser.add_argument("--keep", action="store_true", help="Keep the work dirs.")
+    args = parser.parse_args()
+
+    stage_args = {
+        stage: shlex.split(getattr(args, f"{stage}_args")) for stage, _ in STAGES
+    }
+    results = []
+    for size in args.sizes:
+        results.extend(benchmark_size(size, stage_args, args.repeat, args.keep))
+
+    document = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    out = Path(
+        args.out
+        or f"artifacts/benchmarks/training-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    print(f"Saved results to {out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = find_regressions(
+            results, baseline, args.threshold, args.rss_threshold
+        )
+        if regressions:
+            print("Regressions against the baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
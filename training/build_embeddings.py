@@ -0,0 +1,222 @@
+import argparse
+import json
+import math
+import os
+import shutil
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import Pipeline
+
+from corpus import DATA_PATH, corpus_dir_for, load_corpus
+
+
+EMBEDDINGS_DIR = Path("artifacts/embeddings")
+# Checked by backend/app/services/similarity.py, which keeps its own copy.
+EMBEDDINGS_FORMAT = 1
+
+# Layout of artifacts/embeddings/, read by backend/app/services/similarity.py:
+#   vectors.npy       float32 unit vectors, rows grouped by IVF list
+#   ids.npy           int64 corpus record index of each row
+#   rows.npy          int64 row of each corpus record (inverse of ids.npy)
+#   centroids.npy     float32 IVF list centroids
+#   list_offsets.npy  int64 first row of each list, one more than lists
+#   encoder.joblib    TF-IDF + SVD pipeline for free-text queries (tfidf only)
+#   meta.json         method, sizes and the corpus version; written last
+
+
+def corpus_fingerprint(data_path):
+    # Content digest, so rewriting an identical papers.jsonl keeps the index.
+    meta_path = corpus_dir_for(data_path) / "meta.json"
+    return json.loads(meta_path.read_text(encoding="utf-8"))["digest"]
+
+
+def normalize(block):
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (block / norms).astype(np.float32, copy=False)
+
+
+def fit_tfidf_encoder(corpus, dim, fit_sample, max_features, rng):
+    # The vocabulary and the projection are learned on a sample; every
+    # record is then only transformed, a chunk at a time.
+    sample = np.sort(rng.choice(len(corpus), min(len(corpus), fit_sample), replace=False))
+    tfidf = TfidfVectorizer(
+        max_features=max_features,
+        sublinear_tf=True,
+        stop_words="english",
+        dtype=np.float32,
+    )
+    X = tfidf.fit_transform(corpus.iter_texts(sample.tolist()))
+    dim = max(1, min(dim, X.shape[0] - 1, X.shape[1] - 1))
+    svd = TruncatedSVD(n_components=dim, random_state=42).fit(X)
+    encoder = Pipeline([("tfidf", tfidf), ("svd", svd)])
+    return encoder, dim, encoder.transform
+
+
+def hf_encoder(model_dir, max_length, batch_size):
+    # Imported here so the default TF-IDF path does not pay for torch.
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    # The classifier checkpoint minus its head; vectors are mean-pooled
+    # token states.
+    model = AutoModel.from_pretrained(model_dir).eval()
+
+    def encode(texts):
+        pooled = []
+        for start in range(0, len(texts), batch_size):
+            batch = tokenizer(
+                texts[start : start + batch_size],
+                truncation=True,
+                max_length=max_length,
+                padding=True,
+                return_tensors="pt",
+            )
+            with torch.inference_mode():
+                states = model(**batch).last_hidden_state
+            mask = batch["attention_mask"].unsqueeze(-1).to(states.dtype)
+            pooled.append(((states * mask).sum(1) / mask.sum(1)).numpy())
+        return np.concatenate(pooled)
+
+    return model.config.hidden_size, encode
+
+
+def write_vectors(path, corpus, encode, dim, chunk_size):
+    vectors = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float32, shape=(len(corpus), dim)
+    )
+    for start in range(0, len(corpus), chunk_size):
+        stop = min(start + chunk_size, len(corpus))
+        vectors[start:stop] = normalize(
+            np.asarray(encode(corpus.texts(range(start, stop))), dtype=np.float32)
+        )
+        print(f"Encoded {stop}/{len(corpus)} records.")
+    vectors.flush()
+    return vectors
+
+
+def assign(vectors, centroids, chunk_size=16384):
+    # Nearest centroid by inner product, in chunks so the score matrix stays
+    # at chunk_size x lists.
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        block = np.asarray(vectors[start : start + chunk_size])
+        labels[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def train_centroids(vectors, nlist, sample_size, iterations, rng):
+    # Spherical k-means on a sample: centroids are re-normalized means, so
+    # inner product ranks lists the same way it ranks vectors.
+    picked = np.sort(rng.choice(len(vectors), min(len(vectors), sample_size), replace=False))
+    sample = np.asarray(vectors[picked])
+    nlist = min(nlist, len(sample))
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = np.flatnonzero(np.bincount(labels, minlength=nlist) == 0)
+        # Empty lists restart from random points instead of staying dead.
+        sums[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        centroids = normalize(sums)
+    return centroids
+
+
+def build_index(tmp_dir, raw_path, nlist, train_sample, iterations, chunk_size, rng):
+    raw = np.load(raw_path, mmap_mode="r")
+    centroids = train_centroids(raw, nlist, train_sample, iterations, rng)
+    labels = assign(raw, centroids)
+    order = np.argsort(labels, kind="stable")
+    sizes = np.bincount(labels, minlength=len(centroids))
+
+    # Rows of one list are stored contiguously, so a probe reads one slice.
+    vectors = np.lib.format.open_memmap(
+        tmp_dir / "vectors.npy", mode="w+", dtype=np.float32, shape=raw.shape
+    )
+    for start in range(0, len(order), chunk_size):
+        vectors[start : start + chunk_size] = raw[order[start : start + chunk_size]]
+    vectors.flush()
+    rows = np.empty_like(order)
+    rows[order] = np.arange(len(order))
+
+    np.save(tmp_dir / "ids.npy", order)
+    np.save(tmp_dir / "rows.npy", rows)
+    np.save(tmp_dir / "centroids.npy", centroids)
+    np.save(tmp_dir / "list_offsets.npy", np.concatenate([[0], np.cumsum(sizes)]))
+    return len(centroids)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Embed every paper and build an IVF index for similar-paper search."
+    )
+    parser.add_argument("--method", choices=["tfidf", "hf"], default="tfidf")
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--out-dir", default=str(EMBEDDINGS_DIR))
+    parser.add_argument("--dim", type=int, default=128, help="SVD components (tfidf).")
+    parser.add_argument("--max-features", type=int, default=100000)
+    parser.add_argument("--fit-sample", type=int, default=200000)
+    parser.add_argument("--model-dir", default="artifacts/hf_model")
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument(
+        "--nlist",
+        type=int,
+        default=None,
+        help="IVF lists (default: 4 * sqrt(records)).",
+    )
+    parser.add_argument("--train-sample", type=int, default=256000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    data_path = Path(args.data)
+    corpus = load_corpus(data_path)
+    if not len(corpus):
+        raise ValueError("No samples found. Check preprocessing output.")
+    rng = np.random.default_rng(42)
+
+    out_dir = Path(args.out_dir)
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    if args.method == "tfidf":
+        encoder, dim, encode = fit_tfidf_encoder(
+            corpus, args.dim, args.fit_sample, args.max_features, rng
+        )
+        joblib.dump(encoder, tmp_dir / "encoder.joblib")
+    else:
+        dim, encode = hf_encoder(args.model_dir, args.max_length, args.batch_size)
+
+    raw_path = tmp_dir / "vectors.raw.npy"
+    write_vectors(raw_path, corpus, encode, dim, args.chunk_size)
+    nlist = args.nlist or int(4 * math.sqrt(len(corpus)))
+    nlist = max(1, min(nlist, len(corpus)))
+    nlist = build_index(
+        tmp_dir, raw_path, nlist, args.train_sample, args.iterations, args.chunk_size, rng
+    )
+    raw_path.unlink()
+
+    meta = {
+        "format": EMBEDDINGS_FORMAT,
+        "method": args.method,
+        "dim": dim,
+        "records": len(corpus),
+        "nlist": nlist,
+        "corpus": corpus_fingerprint(data_path),
+    }
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    print(f"Saved {len(corpus)} {dim}-d vectors in {nlist} lists to {out_dir}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from array import array
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+
+DATA_PATH = Path("data/processed/papers.jsonl")
+CORPUS_FORMAT = 3
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Columnar layout of papers.jsonl under data/processed/corpus/:
+#   labels.npy   int32 label code per record (index into meta["label_names"])
+#   offsets.npy  int64 byte offsets into text.bin, one more than records
+#   published.npy int32 publication day (days since 1970-01-01, -1 if unknown)
+#   text.bin     UTF-8 texts concatenated back to back
+#   meta.json    label names, record count, the papers.jsonl version (mtime,
+#                size) and a digest of its content
+
+
+def corpus_dir_for(data_path):
+    return data_path.parent / "corpus"
+
+
+def _source_version(data_path):
+    st = data_path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+def build_corpus(data_path=DATA_PATH):
+    corpus_dir = corpus_dir_for(data_path)
+    corpus_dir.parent.mkdir(parents=True, exist_ok=True)
+    # Pipeline stages may rebuild a stale corpus at the same time, so each
+    # build writes into its own directory.
+    tmp_dir = Path(
+        tempfile.mkdtemp(prefix=corpus_dir.name + ".", dir=corpus_dir.parent)
+    )
+
+    label_ids = {}
+    codes = array("i")
+    published = array("i")
+    offsets = array("q", [0])
+    digest = hashlib.sha1()
+    with data_path.open("r", encoding="utf-8") as f, (tmp_dir / "text.bin").open(
+        "wb"
+    ) as blob:
+        for line in f:
+            digest.update(line.encode("utf-8"))
+            record = json.loads(line)
+            encoded = record["text"].encode("utf-8")
+            blob.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+            codes.append(label_ids.setdefault(record["label"], len(label_ids)))
+            day = record.get("published")
+            published.append(
+                date.fromisoformat(day).toordinal() - EPOCH_ORDINAL if day else -1
+            )
+
+    # Re-code labels in sorted order so codes are stable across rebuilds.
+    label_names = sorted(label_ids)
+    rank = {name: i for i, name in enumerate(label_names)}
+    remap = np.empty(len(label_ids), dtype=np.int32)
+    for name, code in label_ids.items():
+        remap[code] = rank[name]
+    label_codes = remap[np.frombuffer(codes, dtype=np.int32)]
+
+    np.save(tmp_dir / "labels.npy", label_codes)
+    np.save(tmp_dir / "offsets.npy", np.frombuffer(offsets, dtype=np.int64))
+    np.save(tmp_dir / "published.npy", np.frombuffer(published, dtype=np.int32))
+    meta = {
+        "format": CORPUS_FORMAT,
+        "records": len(codes),
+        "label_names": label_names,
+        "source": _source_version(data_path),
+        # Identifies the records themselves: unlike "source" it survives a
+        # rewrite of papers.jsonl with the same content.
+        "digest": digest.hexdigest(),
+    }
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    # Move the old copy aside before swapping in the new one. If another
+    # build swaps its copy in first, this one is dropped: both were read
+    # from the same papers.jsonl.
+    old_dir = Path(
+        tempfile.mkdtemp(prefix=corpus_dir.name + ".old.", dir=corpus_dir.parent)
+    )
+    try:
+        os.replace(corpus_dir, old_dir / corpus_dir.name)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(tmp_dir, corpus_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return corpus_dir
+
+
+def _is_fresh(corpus_dir, data_path):
+    meta_path = corpus_dir / "meta.json"
+    if not meta_path.exists():
+        return False
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta.get("format") != CORPUS_FORMAT:
+        return False
+    return not data_path.exists() or meta.get("source") == _source_version(data_path)
+
+
+class Corpus:
+    # Read-only view over the columnar corpus. Label codes and offsets are
+    # memory-mapped NumPy arrays; texts are decoded from the mmapped blob on
+    # access, so opening a corpus costs no parsing.
+    def __init__(self, corpus_dir):
+        meta = json.loads((corpus_dir / "meta.json").read_text(encoding="utf-8"))
+        self.label_names = meta["label_names"]
+        self.label_codes = np.load(corpus_dir / "labels.npy", mmap_mode="r")
+        self.offsets = np.load(corpus_dir / "offsets.npy", mmap_mode="r")
+        self.published = np.load(corpus_dir / "published.npy", mmap_mode="r")
+        with (corpus_dir / "text.bin").open("rb") as f:
+            self._blob = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if self.offsets[-1]
+                else b""
+            )
+
+    def __len__(self):
+        return len(self.label_codes)
+
+    def text(self, i):
+        return self._blob[self.offsets[i] : self.offsets[i + 1]].decode("utf-8")
+
+    def iter_texts(self, indices=None):
+        offsets = self.offsets.tolist()
+        for i in range(len(self)) if indices is None else indices:
+            yield self._blob[offsets[i] : offsets[i + 1]].decode("utf-8")
+
+    def texts(self, indices=None):
+        return list(self.iter_texts(indices))
+
+    def labels(self, indices=None):
+        codes = self.label_codes if indices is None else self.label_codes[indices]
+        names = np.asarray(self.label_names, dtype=object)
+        return names[codes].tolist()
+
+
+def load_corpus(data_path=DATA_PATH):
+    corpus_dir = corpus_dir_for(data_path)
+    if not _is_fresh(corpus_dir, data_path):
+        if not data_path.exists():
+            raise FileNotFoundError(
+                "Missing data/processed/papers.jsonl. Run preprocessing first."
+            )
+        build_corpus(data_path)
+    return Corpus(corpus_dir)
@@ -1,53 +1,206 @@
 import argparse
 import json
+import os
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 
 ARXIV_API = "http://export.arxiv.org/api/query"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
-def fetch_arxiv(start=0, max_results=200, search_query="cat:cs.AI"):
+class TokenBucket:
+    # Spaces requests at `rate` per second on average, allowing short bursts
+    # of up to `capacity` requests; shared by all fetch threads. A rate of
+    # None disables limiting.
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate is None:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_arxiv(
+    start=0, max_results=200, search_query="cat:cs.AI", session=None, base_url=ARXIV_API
+):
     params = {
         "search_query": search_query,
         "start": start,
         "max_results": max_results,
     }
-    resp = requests.get(ARXIV_API, params=params, timeout=30)
+    resp = (session or requests).get(base_url, params=params, timeout=30)
     resp.raise_for_status()
     return resp.text
 
 
+def retry_after(response):
+    # Seconds the server asked us to wait, from either form of Retry-After.
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def fetch_with_retry(session, limiter, start, args):
+    for attempt in range(args.retries + 1):
+        limiter.acquire()
+        try:
+            return fetch_arxiv(
+                start=start,
+                max_results=args.batch_size,
+                search_query=args.query,
+                session=session,
+                base_url=args.base_url,
+            )
+        except requests.RequestException as exc:
+            status = exc.response.status_code if exc.response is not None else None
+            if attempt == args.retries or (
+                status is not None and status not in RETRY_STATUSES
+            ):
+                raise
+            delay = args.backoff * (2**attempt)
+            # A 429/503 may say how long to back off; never retry sooner.
+            time.sleep(
+                max(delay + random.uniform(0, delay), retry_after(exc.response))
+            )
+
+
+def write_text_atomic(path, text):
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(manifest_path, args):
+    if args.restart or not manifest_path.exists():
+        return set()
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if (manifest.get("query"), manifest.get("batch_size")) != (
+        args.query,
+        args.batch_size,
+    ):
+        return set()
+    # Manifests written before checkpointing only exist for finished runs.
+    completed = manifest.get("completed", range(manifest.get("batches", 0)))
+    return set(completed)
+
+
+def write_checkpoint(manifest_path, args, completed):
+    next_batch = 0
+    while next_batch in completed:
+        next_batch += 1
+    manifest = {
+        "batches": args.batches,
+        "query": args.query,
+        "batch_size": args.batch_size,
+        "completed": sorted(completed),
+        "next_offset": next_batch * args.batch_size,
+    }
+    write_text_atomic(manifest_path, json.dumps(manifest, indent=2))
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--query", default="cat:cs.AI")
     parser.add_argument("--batches", type=int, default=5)
     parser.add_argument("--batch-size", type=int, default=200)
-    parser.add_argument("--sleep", type=float, default=2.0)
+    parser.add_argument(
+        "--sleep",
+        type=float,
+        default=2.0,
+        help="Average seconds between requests; ignored when --rate is set.",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=None, help="Requests per second."
+    )
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--backoff", type=float, default=2.0)
+    parser.add_argument("--base-url", default=ARXIV_API)
+    parser.add_argument("--out-dir", default="data/raw")
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore the checkpoint and refetch."
+    )
     args = parser.parse_args()
 
-    out_dir = Path("data/raw")
+    out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
-    batch_count = args.batches
-    batch_size = args.batch_size
+    manifest_path = out_dir / "manifest.json"
 
-    for i in range(batch_count):
-        xml_text = fetch_arxiv(
-            start=i * batch_size, max_results=batch_size, search_query=args.query
-        )
-        out_file = out_dir / f"arxiv_{i}.xml"
-        out_file.write_text(xml_text, encoding="utf-8")
-        time.sleep(args.sleep)
+    completed = load_checkpoint(manifest_path, args)
+    pending = [
+        i
+        for i in range(args.batches)
+        if i not in completed or not (out_dir / f"arxiv_{i}.xml").exists()
+    ]
+    completed -= set(pending)
+    rate = args.rate or (1.0 / args.sleep if args.sleep > 0 else None)
+    limiter = TokenBucket(rate, capacity=args.burst)
+    session = make_session(args.concurrency)
+    lock = threading.Lock()
 
-    manifest = {
-        "batches": batch_count,
-        "query": args.query,
-        "batch_size": batch_size,
-    }
-    Path("data/raw/manifest.json").write_text(
-        json.dumps(manifest, indent=2), encoding="utf-8"
-    )
+    def fetch_batch(i):
+        xml_text = fetch_with_retry(session, limiter, i * args.batch_size, args)
+        write_text_atomic(out_dir / f"arxiv_{i}.xml", xml_text)
+        with lock:
+            completed.add(i)
+            write_checkpoint(manifest_path, args, completed)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(fetch_batch, i) for i in pending]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+
+    write_checkpoint(manifest_path, args, completed)
+    skipped = args.batches - len(pending)
+    print(f"Fetched {len(pending)} batches; {skipped} already done.")
 
 
 if __name__ == "__main__":
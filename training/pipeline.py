@@ -0,0 +1,343 @@
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+
+from preprocess_arxiv import file_sha256, write_json_atomic
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+STATE_PATH = Path("artifacts/pipeline/state.json")
+RUNS_DIR = Path("artifacts/pipeline/runs")
+PY = sys.executable
+
+
+class Stage:
+    # A command plus the files it reads and writes, relative to the repo
+    # root. Globs are allowed in inputs; a missing input simply hashes as
+    # absent, which covers optional artifacts like hf_summary.json.
+    # by_mtime also folds each input's (mtime, size) into the hash, for
+    # outputs that record those themselves (the dashboard snapshot).
+    def __init__(self, name, command, inputs, outputs, default=True, by_mtime=False):
+        self.name = name
+        self.command = command
+        self.inputs = inputs
+        self.outputs = outputs
+        self.default = default
+        self.by_mtime = by_mtime
+
+
+STAGES = [
+    Stage(
+        "ingest",
+        [PY, "training/ingest_arxiv.py"],
+        ["training/ingest_arxiv.py", "training/config.yaml"],
+        ["data/raw/manifest.json"],
+        # Talks to the arXiv API; only run when asked for.
+        default=False,
+    ),
+    Stage(
+        "preprocess",
+        [PY, "training/preprocess_arxiv.py", "--incremental"],
+        [
+            "training/preprocess_arxiv.py",
+            "training/corpus.py",
+            "backend/app/services/trends.py",
+            "data/raw/manifest.json",
+            "data/raw/arxiv_*.xml",
+        ],
+        # corpus/ is derived from papers.jsonl, and its meta.json carries
+        # file mtimes, so downstream stages hash papers.jsonl instead.
+        [
+            "data/processed/papers.jsonl",
+            "data/processed/label_stats.json",
+            "data/processed/trend_index.json",
+        ],
+    ),
+    Stage(
+        "data_qa",
+        [PY, "-m", "backend.app.agents.data_qa_agent"],
+        [
+            "backend/app/agents/data_qa_agent.py",
+            "backend/app/services/sample_data.py",
+            "data/processed/papers.jsonl",
+        ],
+        ["artifacts/data_quality.json"],
+    ),
+    Stage(
+        "analyze",
+        [PY, "training/analyze_dataset.py"],
+        [
+            "training/analyze_dataset.py",
+            "training/corpus.py",
+            "data/processed/papers.jsonl",
+        ],
+        ["artifacts/data_insights.json"],
+    ),
+    Stage(
+        "train_classifier",
+        [PY, "training/train_classifier.py"],
+        [
+            "training/train_classifier.py",
+            "training/corpus.py",
+            "data/processed/papers.jsonl",
+        ],
+        ["artifacts/classifier.joblib", "artifacts/report.json"],
+    ),
+    Stage(
+        "train_transformer",
+        [PY, "training/train_transformer.py"],
+        [
+            "training/train_transformer.py",
+            "training/tokenized_cache.py",
+            "training/corpus.py",
+            "data/processed/papers.jsonl",
+        ],
+        [
+            "artifacts/hf_model/config.json",
+            "artifacts/hf_report.json",
+            "artifacts/hf_summary.json",
+        ],
+        # Hours on CPU; opt in with --with-transformer.
+        default=False,
+    ),
+    Stage(
+        "embeddings",
+        [PY, "training/build_embeddings.py"],
+        [
+            "training/build_embeddings.py",
+            "training/corpus.py",
+            "data/processed/papers.jsonl",
+        ],
+        ["artifacts/embeddings/meta.json"],
+    ),
+    Stage(
+        "evaluate",
+        [PY, "training/evaluate.py"],
+        ["training/evaluate.py", "artifacts/report.json"],
+        ["artifacts/summary.json"],
+    ),
+    Stage(
+        "snapshot",
+        [PY, "-m", "backend.app.services.snapshot"],
+        [
+            "backend/app/services/snapshot.py",
+            "backend/app/services/sample_data.py",
+            "backend/app/services/trends.py",
+            "backend/app/services/serialization.py",
+            "backend/app/schemas.py",
+            "artifacts/summary.json",
+            "artifacts/report.json",
+            "artifacts/hf_summary.json",
+            "artifacts/hf_report.json",
+            "artifacts/data_insights.json",
+            "artifacts/data_quality.json",
+            "data/processed/label_stats.json",
+            "data/processed/trend_index.json",
+        ],
+        ["artifacts/dashboard_snapshot.json"],
+        # The API ignores a snapshot once a source's mtime moves, even if its
+        # content is unchanged, so a rewrite alone must rebuild it.
+        by_mtime=True,
+    ),
+]
+
+
+def dependencies(stages):
+    # B depends on A when B reads something A writes.
+    produced = {output: stage.name for stage in stages for output in stage.outputs}
+    return {
+        stage.name: {
+            produced[path]
+            for path in stage.inputs
+            if path in produced and produced[path] != stage.name
+        }
+        for stage in stages
+    }
+
+
+def select_stages(targets, with_ingest, with_transformer):
+    enabled = [
+        stage
+        for stage in STAGES
+        if stage.default
+        or (stage.name == "ingest" and with_ingest)
+        or (stage.name == "train_transformer" and with_transformer)
+        or stage.name in targets
+    ]
+    if not targets:
+        return enabled
+    # Named targets plus everything upstream of them.
+    deps = dependencies(enabled)
+    wanted, pending = set(), list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(deps.get(name, ()))
+    return [stage for stage in enabled if stage.name in wanted]
+
+
+class InputHasher:
+    # Content hashes, reused while a file's (mtime, size) is unchanged so
+    # multi-gigabyte inputs are not re-read on every run.
+    def __init__(self, known):
+        self.known = known
+
+    def file(self, path):
+        st = path.stat()
+        key = str(path)
+        entry = self.known.get(key)
+        if entry and entry[:2] == [st.st_mtime_ns, st.st_size]:
+            return entry[2]
+        digest = file_sha256(path)
+        self.known[key] = [st.st_mtime_ns, st.st_size, digest]
+        return digest
+
+    def stage(self, stage):
+        digest = hashlib.sha256(json.dumps(stage.command[1:]).encode("utf-8"))
+        for pattern in stage.inputs:
+            paths = sorted(ROOT_DIR.glob(pattern)) if "*" in pattern else [ROOT_DIR / pattern]
+            for path in paths:
+                value = self.file(path) if path.is_file() else "absent"
+                if stage.by_mtime and path.is_file():
+                    st = path.stat()
+                    value += f":{st.st_mtime_ns}:{st.st_size}"
+                digest.update(f"{path.relative_to(ROOT_DIR)}={value}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+
+def run_stage(stage):
+    started = time.perf_counter()
+    result = subprocess.run(stage.command, cwd=ROOT_DIR)
+    return result.returncode, time.perf_counter() - started
+
+
+def run_pipeline(stages, jobs, force, dry_run):
+    state_path = ROOT_DIR / STATE_PATH
+    state = (
+        json.loads(state_path.read_text(encoding="utf-8"))
+        if state_path.exists()
+        else {"stages": {}, "files": {}}
+    )
+    hasher = InputHasher(state["files"])
+    deps = dependencies(stages)
+    remaining = {stage.name: stage for stage in stages}
+    done, failed, timings = set(), set(), {}
+    # Dry runs cannot rehash outputs that were never rebuilt, so whatever
+    # reads from a stage that would run is reported as running too.
+    would_run = set()
+    running = {}
+
+    def ready(name):
+        return deps[name] <= done and not deps[name] & failed
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while remaining or running:
+            # Hash inputs only once upstream stages have finished writing.
+            for name in [n for n in remaining if ready(n)]:
+                stage = remaining.pop(name)
+                inputs_hash = hasher.stage(stage)
+                previous = state["stages"].get(name, {})
+                outputs_exist = all((ROOT_DIR / p).exists() for p in stage.outputs)
+                stale_upstream = dry_run and deps[name] & would_run
+                if (
+                    not force
+                    and not stale_upstream
+                    and previous.get("inputs") == inputs_hash
+                    and outputs_exist
+                ):
+                    print(f"[skip] {name}: inputs unchanged")
+                    timings[name] = {"status": "skipped", "wall_s": 0.0}
+                    done.add(name)
+                    continue
+                if dry_run:
+                    print(f"[would run] {name}: {' '.join(stage.command[1:])}")
+                    timings[name] = {"status": "dry-run", "wall_s": 0.0}
+                    would_run.add(name)
+                    done.add(name)
+                    continue
+                print(f"[run] {name}: {' '.join(stage.command[1:])}")
+                running[pool.submit(run_stage, stage)] = (stage, inputs_hash)
+
+            blocked = [n for n in remaining if deps[n] & failed]
+            for name in blocked:
+                print(f"[blocked] {name}: upstream stage failed")
+                timings[name] = {"status": "blocked", "wall_s": 0.0}
+                failed.add(remaining.pop(name).name)
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, inputs_hash = running.pop(future)
+                returncode, wall = future.result()
+                status = "ok" if returncode == 0 else f"failed ({returncode})"
+                print(f"[{status}] {stage.name} in {wall:.1f}s")
+                timings[stage.name] = {"status": status, "wall_s": wall}
+                if returncode == 0:
+                    done.add(stage.name)
+                    state["stages"][stage.name] = {
+                        "inputs": inputs_hash,
+                        "finished_at": datetime.now(timezone.utc).isoformat(),
+                        "wall_s": wall,
+                    }
+                else:
+                    failed.add(stage.name)
+                # Saved after every stage so an interrupted run keeps its work.
+                if not dry_run:
+                    state_path.parent.mkdir(parents=True, exist_ok=True)
+                    write_json_atomic(state_path, state)
+
+    return timings, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the training pipeline, skipping stages whose inputs are unchanged."
+    )
+    parser.add_argument(
+        "targets", nargs="*", help="Stages to bring up to date (default: all)."
+    )
+    parser.add_argument("--jobs", type=int, default=2, help="Stages run concurrently.")
+    parser.add_argument("--force", action="store_true", help="Run even if unchanged.")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--with-ingest", action="store_true")
+    parser.add_argument("--with-transformer", action="store_true")
+    parser.add_argument("--list", action="store_true", help="Show stages and exit.")
+    args = parser.parse_args()
+
+    unknown = set(args.targets) - {stage.name for stage in STAGES}
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    stages = select_stages(set(args.targets), args.with_ingest, args.with_transformer)
+
+    if args.list:
+        deps = dependencies(stages)
+        for stage in stages:
+            after = ", ".join(sorted(deps[stage.name])) or "-"
+            print(f"{stage.name:<18} after: {after}")
+        return
+
+    started = time.perf_counter()
+    timings, failed = run_pipeline(stages, args.jobs, args.force, args.dry_run)
+    total = time.perf_counter() - started
+
+    if not args.dry_run:
+        runs_dir = ROOT_DIR / RUNS_DIR
+        runs_dir.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(
+            runs_dir / f"{datetime.now():%Y%m%d-%H%M%S}.json",
+            {"total_s": total, "jobs": args.jobs, "stages": timings},
+        )
+    print(f"Pipeline finished in {total:.1f}s.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,25 @@
 import argparse
+import hashlib
 import json
+import os
+import sys
+import tempfile
 import xml.etree.ElementTree as ET
-from collections import Counter
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
 from pathlib import Path
 
+from corpus import build_corpus
+
+# The trend index layout is owned by the API that reads it.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from backend.app.services.trends import TREND_FORMAT, bucket_range  # noqa: E402
 
 ATOM_NS = {"atom": "http://www.w3.org/2005/Atom"}
+ENTRY_TAG = f"{{{ATOM_NS['atom']}}}entry"
+# Bump when record extraction changes so incremental runs rebuild shards.
+SHARD_FORMAT = 3
 
 
 def iter_entries(xml_text):
@@ -14,10 +28,23 @@ def iter_entries(xml_text):
         yield entry
 
 
+def iter_entries_stream(xml_path):
+    # Parses one entry at a time and drops it from the tree once consumed,
+    # so memory stays bounded by a single entry rather than the whole file.
+    context = ET.iterparse(xml_path, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event == "end" and elem.tag == ENTRY_TAG:
+            yield elem
+            root.clear()
+
+
 def extract_text(entry):
     title_node = entry.find("atom:title", ATOM_NS)
     summary_node = entry.find("atom:summary", ATOM_NS)
-    title = (title_node.text or "").strip()
+    # Feed titles wrap across lines; records keep the title on the first line
+    # so "title\nabstract" can be split again downstream.
+    title = " ".join((title_node.text or "").split())
     summary = (summary_node.text or "").strip()
     return title, summary
 
@@ -30,38 +57,123 @@ def extract_label(entry):
     return term
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--min-label-count", type=int, default=2)
-    args = parser.parse_args()
+def extract_published(entry):
+    node = entry.find("atom:published", ATOM_NS)
+    if node is None:
+        return ""
+    # "2024-01-15T10:00:00Z" -> "2024-01-15"
+    return (node.text or "").strip()[:10]
 
-    raw_dir = Path("data/raw")
-    out_dir = Path("data/processed")
-    out_dir.mkdir(parents=True, exist_ok=True)
 
-    xml_files = sorted(raw_dir.glob("arxiv_*.xml"))
-    if not xml_files:
-        raise FileNotFoundError("No XML files found in data/raw. Run ingest first.")
+def iter_records(entries):
+    for entry in entries:
+        title, summary = extract_text(entry)
+        label = extract_label(entry)
+        if not title or not summary or label == "unknown":
+            continue
+        yield {
+            "text": f"{title}\n{summary}",
+            "label": label,
+            "published": extract_published(entry),
+        }
+
+
+def count_record(label_counts, day_counts, record):
+    label_counts[record["label"]] += 1
+    if record["published"]:
+        day_counts[record["label"]][record["published"]] += 1
+
+
+def spill_file(xml_file, spill_path):
+    # First pass: parse one raw file, spilling `label<TAB>json` lines to disk
+    # and keeping only label and per-day counts in memory. Runs in worker
+    # processes.
+    label_counts = Counter()
+    day_counts = defaultdict(Counter)
+    with spill_path.open("w", encoding="utf-8") as spill:
+        for record in iter_records(iter_entries_stream(xml_file)):
+            spill.write(f"{record['label']}\t{json.dumps(record)}\n")
+            count_record(label_counts, day_counts, record)
+    return label_counts, {label: dict(days) for label, days in day_counts.items()}
 
+
+def merge_day_counts(per_file_days):
+    merged = defaultdict(Counter)
+    for days in per_file_days:
+        for label, counts in days.items():
+            merged[label].update(counts)
+    return merged
+
+
+def _week_key(day):
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+TREND_BUCKETS = {
+    "day": lambda day: day,
+    "week": _week_key,
+    "month": lambda day: day[:7],
+}
+
+
+def build_trend_index(day_counts, kept_labels):
+    # Pre-aggregated per-label counts at every granularity, aligned on one
+    # sorted bucket axis per granularity so the API can answer range queries
+    # with a bisect and a slice.
+    labels = sorted(label for label in day_counts if label in kept_labels)
+    index = {"format": TREND_FORMAT, "labels": labels}
+    for granularity, bucket_of in TREND_BUCKETS.items():
+        per_label = {label: Counter() for label in labels}
+        for label in labels:
+            for day, count in day_counts[label].items():
+                per_label[label][bucket_of(day)] += count
+        present = set().union(*per_label.values())
+        # Periods without papers are kept as zeros, so the axis has no gaps.
+        buckets = (
+            bucket_range(min(present), max(present), granularity) if present else []
+        )
+        index[granularity] = {
+            "buckets": buckets,
+            "counts": {
+                label: [per_label[label][bucket] for bucket in buckets]
+                for label in labels
+            },
+        }
+    return index
+
+
+def filter_spills(spill_paths, kept_labels, out_path):
+    # Second pass: stream the spills back in file order and keep records of
+    # frequent labels.
+    kept_counts = Counter()
+    with out_path.open("w", encoding="utf-8") as out_file:
+        for spill_path in spill_paths:
+            with spill_path.open("r", encoding="utf-8") as spill:
+                for line in spill:
+                    label, payload = line.split("\t", 1)
+                    if label not in kept_labels:
+                        continue
+                    out_file.write(payload)
+                    kept_counts[label] += 1
+    return kept_counts
+
+
+def preprocess_in_memory(xml_files, min_label_count, out_path):
     records = []
     label_counts = Counter()
+    day_counts = defaultdict(Counter)
 
     for xml_file in xml_files:
         xml_text = xml_file.read_text(encoding="utf-8")
-        for entry in iter_entries(xml_text):
-            title, summary = extract_text(entry)
-            label = extract_label(entry)
-            if not title or not summary or label == "unknown":
-                continue
-            text = f"{title}\n{summary}"
-            records.append({"text": text, "label": label})
-            label_counts[label] += 1
+        for record in iter_records(iter_entries(xml_text)):
+            records.append(record)
+            count_record(label_counts, day_counts, record)
 
     kept_labels = {
-        label for label, count in label_counts.items() if count >= args.min_label_count
+        label for label, count in label_counts.items() if count >= min_label_count
     }
 
-    out_path = out_dir / "papers.jsonl"
     kept_counts = Counter()
     with out_path.open("w", encoding="utf-8") as out_file:
         for record in records:
@@ -69,9 +181,162 @@ def main():
                 continue
             out_file.write(json.dumps(record) + "\n")
             kept_counts[record["label"]] += 1
+    return label_counts, kept_counts, day_counts
+
+
+def build_spills(xml_files, spill_paths, workers=1):
+    if workers > 1 and len(xml_files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(spill_file, xml_files, spill_paths))
+    return list(map(spill_file, xml_files, spill_paths))
+
+
+def merge_and_filter(spill_paths, per_file_stats, min_label_count, out_path):
+    # Merging in file order keeps label first-seen order, and therefore
+    # label_stats.json, identical to the serial path.
+    label_counts = Counter()
+    for counts, _ in per_file_stats:
+        label_counts.update(counts)
+    kept_labels = {
+        label for label, count in label_counts.items() if count >= min_label_count
+    }
+    kept_counts = filter_spills(spill_paths, kept_labels, out_path)
+    day_counts = merge_day_counts(days for _, days in per_file_stats)
+    return label_counts, kept_counts, day_counts
+
+
+def preprocess_streaming(xml_files, min_label_count, out_path, workers=1):
+    with tempfile.TemporaryDirectory(dir=out_path.parent) as tmp_dir:
+        spill_paths = [Path(tmp_dir) / f"{i:06d}.tsv" for i in range(len(xml_files))]
+        per_file_stats = build_spills(xml_files, spill_paths, workers)
+        return merge_and_filter(spill_paths, per_file_stats, min_label_count, out_path)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path):
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("format") == SHARD_FORMAT:
+            return manifest
+    return {"format": SHARD_FORMAT, "files": {}}
+
+
+def write_json_atomic(path, payload):
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def preprocess_incremental(xml_files, min_label_count, out_path, workers=1):
+    # Shards persist under data/processed/shards; the manifest records each raw
+    # file's content hash, record count, label counts and per-day counts so
+    # unchanged files are neither re-parsed nor re-read to rebuild the label
+    # counters and the trend index.
+    shard_dir = out_path.parent / "shards"
+    shard_dir.mkdir(exist_ok=True)
+    manifest_path = out_path.parent / "preprocess_manifest.json"
+    previous = load_manifest(manifest_path)["files"]
+
+    files = {}
+    stale = []
+    for xml_file in xml_files:
+        digest = file_sha256(xml_file)
+        shard_path = shard_dir / f"{xml_file.stem}.tsv"
+        entry = previous.get(xml_file.name)
+        if entry and entry["sha256"] == digest and shard_path.exists():
+            files[xml_file.name] = entry
+        else:
+            stale.append((xml_file, shard_path, digest))
+
+    per_file_stats = build_spills(
+        [xml_file for xml_file, _, _ in stale],
+        [shard_path for _, shard_path, _ in stale],
+        workers,
+    )
+    for (xml_file, shard_path, digest), (counts, days) in zip(stale, per_file_stats):
+        files[xml_file.name] = {
+            "sha256": digest,
+            "records": sum(counts.values()),
+            "labels": dict(counts),
+            "days": days,
+        }
+
+    for name in set(previous) - set(files):
+        (shard_dir / f"{Path(name).stem}.tsv").unlink(missing_ok=True)
+
+    write_json_atomic(
+        manifest_path,
+        {"format": SHARD_FORMAT, "files": {f.name: files[f.name] for f in xml_files}},
+    )
+    print(f"Parsed {len(stale)} of {len(xml_files)} raw files; reused the rest.")
+
+    return merge_and_filter(
+        [shard_dir / f"{xml_file.stem}.tsv" for xml_file in xml_files],
+        [
+            (Counter(files[f.name]["labels"]), files[f.name]["days"])
+            for f in xml_files
+        ],
+        min_label_count,
+        out_path,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-label-count", type=int, default=2)
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse entries incrementally and filter through an on-disk spill.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse raw files in N processes (implies --stream).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only parse raw files that changed since the last run (implies --stream).",
+    )
+    args = parser.parse_args()
+
+    raw_dir = Path("data/raw")
+    out_dir = Path("data/processed")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    xml_files = sorted(raw_dir.glob("arxiv_*.xml"))
+    if not xml_files:
+        raise FileNotFoundError("No XML files found in data/raw. Run ingest first.")
+
+    out_path = out_dir / "papers.jsonl"
+    if args.incremental:
+        label_counts, kept_counts, day_counts = preprocess_incremental(
+            xml_files, args.min_label_count, out_path, workers=args.workers
+        )
+    elif args.stream or args.workers > 1:
+        label_counts, kept_counts, day_counts = preprocess_streaming(
+            xml_files, args.min_label_count, out_path, workers=args.workers
+        )
+    else:
+        label_counts, kept_counts, day_counts = preprocess_in_memory(
+            xml_files, args.min_label_count, out_path
+        )
 
     stats_path = out_dir / "label_stats.json"
     stats_path.write_text(json.dumps(kept_counts, indent=2), encoding="utf-8")
+    write_json_atomic(
+        out_dir / "trend_index.json", build_trend_index(day_counts, kept_counts)
+    )
+    build_corpus(out_path)
 
     dropped = sum(label_counts.values()) - sum(kept_counts.values())
     print(f"Saved {sum(kept_counts.values())} records; dropped {dropped}.")
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+from datasets import Dataset, DatasetDict, load_from_disk
+from transformers import AutoTokenizer
+
+from corpus import DATA_PATH, corpus_dir_for, load_corpus
+
+
+TOKENIZED_FORMAT = 1
+
+# Per-process state for Dataset.map workers: the mmapped corpus and the
+# tokenizer are opened once per worker instead of being pickled to it.
+_worker_corpus = None
+_worker_tokenizers = {}
+
+
+def corpus_fingerprint(data_path=DATA_PATH):
+    # Content digest of the papers.jsonl the corpus was built from.
+    meta_path = corpus_dir_for(data_path) / "meta.json"
+    return json.loads(meta_path.read_text(encoding="utf-8"))["digest"]
+
+
+def _indices_digest(indices):
+    return hashlib.sha1(np.asarray(indices, dtype=np.int64).tobytes()).hexdigest()
+
+
+def cache_dir_for(data_path, model_name, max_length, split_indices):
+    key = {
+        "format": TOKENIZED_FORMAT,
+        "tokenizer": model_name,
+        "max_length": max_length,
+        "corpus": corpus_fingerprint(data_path),
+        "splits": {
+            name: _indices_digest(indices) for name, indices in split_indices.items()
+        },
+    }
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+    return data_path.parent / "tokenized" / digest[:16]
+
+
+def tokenize_rows(batch, data_path, model_name, max_length):
+    global _worker_corpus
+    if _worker_corpus is None:
+        _worker_corpus = load_corpus(Path(data_path))
+    tokenizer = _worker_tokenizers.get(model_name)
+    if tokenizer is None:
+        tokenizer = _worker_tokenizers[model_name] = AutoTokenizer.from_pretrained(
+            model_name
+        )
+    encoded = tokenizer(
+        [_worker_corpus.text(i) for i in batch["idx"]],
+        truncation=True,
+        max_length=max_length,
+    )
+    # Stored so the length-grouped sampler need not measure every example.
+    encoded["length"] = [len(ids) for ids in encoded["input_ids"]]
+    return encoded
+
+
+def load_tokenized_splits(
+    split_indices, split_labels, model_name, max_length, num_proc=1, data_path=DATA_PATH
+):
+    # Tokenized splits are saved as Arrow under data/processed/tokenized/,
+    # keyed on the tokenizer, max_length, corpus version and split indices;
+    # a later run with the same key memory-maps them instead of tokenizing.
+    cache_dir = cache_dir_for(data_path, model_name, max_length, split_indices)
+    if (cache_dir / "dataset_dict.json").exists():
+        print(f"Using tokenized splits from {cache_dir}.")
+        return load_from_disk(str(cache_dir))
+
+    tokenized = DatasetDict(
+        {
+            name: Dataset.from_dict(
+                {"idx": list(indices), "label": list(split_labels[name])}
+            ).map(
+                tokenize_rows,
+                batched=True,
+                num_proc=num_proc if num_proc > 1 else None,
+                fn_kwargs={
+                    "data_path": str(data_path),
+                    "model_name": model_name,
+                    "max_length": max_length,
+                },
+                remove_columns=["idx"],
+                new_fingerprint=f"{cache_dir.name}-{name}",
+                desc=f"Tokenizing {name}",
+            )
+            for name, indices in split_indices.items()
+        }
+    )
+
+    tmp_dir = cache_dir.with_name(cache_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tokenized.save_to_disk(str(tmp_dir))
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    return load_from_disk(str(cache_dir))
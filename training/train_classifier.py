@@ -1,32 +1,25 @@
+import argparse
 import json
+import random
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from collections import Counter
-
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import classification_report
 
-
-def load_samples():
-    data_path = Path("data/processed/papers.jsonl")
-    if not data_path.exists():
-        raise FileNotFoundError(
-            "Missing data/processed/papers.jsonl. Run preprocessing first."
-        )
-    samples = []
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            samples.append(json.loads(line))
-    return samples
+from corpus import DATA_PATH, load_corpus
 
 
-def main():
-    samples = load_samples()
-    texts = [s["text"] for s in samples]
-    labels = [s["label"] for s in samples]
+def train_in_memory():
+    corpus = load_corpus()
+    texts = corpus.texts()
+    labels = corpus.labels()
 
     if not texts:
         raise ValueError("No samples found. Check preprocessing output.")
@@ -48,9 +41,133 @@ def main():
 
     model.fit(X_train, y_train)
     preds = model.predict(X_test)
-    report = classification_report(y_test, preds, output_dict=True)
+    return model, classification_report(y_test, preds, output_dict=True)
+
+
+def known_classes(data_path):
+    # partial_fit needs every class up front. Preprocessing records the kept
+    # labels in label_stats.json; without it, one pass over the labels.
+    stats_path = data_path.parent / "label_stats.json"
+    if stats_path.exists():
+        return sorted(json.loads(stats_path.read_text(encoding="utf-8")))
+    labels = set()
+    with data_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            labels.add(json.loads(line)["label"])
+    return sorted(labels)
+
+
+def is_holdout(text, test_fraction):
+    # A hash of the text rather than its position, so the split does not
+    # depend on file order or chunking and is the same on every run.
+    return zlib.crc32(text.encode("utf-8")) % 10000 < test_fraction * 10000
+
+
+def iter_chunks(data_path, chunk_size, holdout, test_fraction):
+    # Yields (texts, labels) for either the training or the holdout side,
+    # at most chunk_size records at a time.
+    texts, labels = [], []
+    with data_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if is_holdout(record["text"], test_fraction) != holdout:
+                continue
+            texts.append(record["text"])
+            labels.append(record["label"])
+            if len(texts) == chunk_size:
+                yield texts, labels
+                texts, labels = [], []
+    if texts:
+        yield texts, labels
+
+
+def _vectorize(vectorizer, texts, labels):
+    return vectorizer.transform(texts), labels
+
+
+def iter_features(chunks, vectorizer, workers):
+    # Hashing is stateless, so chunks can be vectorized in other processes.
+    # At most 2 * workers chunks are in flight, which bounds memory.
+    if workers <= 1:
+        for texts, labels in chunks:
+            yield _vectorize(vectorizer, texts, labels)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for texts, labels in chunks:
+            pending.append(pool.submit(_vectorize, vectorizer, texts, labels))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def train_streaming(args):
+    data_path = Path(args.data)
+    if not data_path.exists():
+        raise FileNotFoundError(
+            "Missing data/processed/papers.jsonl. Run preprocessing first."
+        )
+    classes = known_classes(data_path)
+    if not classes:
+        raise ValueError("No samples found. Check preprocessing output.")
+
+    vectorizer = HashingVectorizer(
+        n_features=args.n_features, ngram_range=(1, 2), alternate_sign=False
+    )
+    clf = SGDClassifier(loss="log_loss", alpha=args.alpha, random_state=42)
+    rng = random.Random(42)
+    for epoch in range(args.epochs):
+        chunks = iter_chunks(data_path, args.chunk_size, False, args.test_size)
+        seen = 0
+        for X, y in iter_features(chunks, vectorizer, args.workers):
+            # Shuffle within the chunk; SGD converges poorly on sorted input.
+            order = list(range(len(y)))
+            rng.shuffle(order)
+            clf.partial_fit(X[order], [y[i] for i in order], classes=classes)
+            seen += len(y)
+        print(f"Epoch {epoch + 1}/{args.epochs}: {seen} training records.")
+
+    y_test, preds = [], []
+    chunks = iter_chunks(data_path, args.chunk_size, True, args.test_size)
+    for X, y in iter_features(chunks, vectorizer, args.workers):
+        y_test.extend(y)
+        preds.extend(clf.predict(X))
+    if not y_test:
+        raise ValueError("Holdout split is empty. Increase --test-size.")
+
+    model = Pipeline([("hashing", vectorizer), ("clf", clf)])
+    return model, classification_report(y_test, preds, output_dict=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Train out of core: hashed features and SGD over chunks.",
+    )
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--n-features", type=int, default=2**20)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=1e-4)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for feature extraction in --streaming mode.",
+    )
+    args = parser.parse_args()
+
+    if args.streaming:
+        model, report = train_streaming(args)
+    else:
+        model, report = train_in_memory()
 
     Path("artifacts").mkdir(exist_ok=True)
+    joblib.dump(model, "artifacts/classifier.joblib")
     Path("artifacts/report.json").write_text(
         json.dumps(report, indent=2), encoding="utf-8"
     )
@@ -1,11 +1,11 @@
 import argparse
 import json
+import os
 from collections import Counter
 from pathlib import Path
 
 import numpy as np
 import torch
-from datasets import Dataset
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 from transformers import (
@@ -16,18 +16,8 @@ from transformers import (
     TrainingArguments,
 )
 
-
-def load_samples():
-    data_path = Path("data/processed/papers.jsonl")
-    if not data_path.exists():
-        raise FileNotFoundError(
-            "Missing data/processed/papers.jsonl. Run preprocessing first."
-        )
-    samples = []
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            samples.append(json.loads(line))
-    return samples
+from corpus import load_corpus
+from tokenized_cache import load_tokenized_splits
 
 
 class WeightedTrainer(Trainer):
@@ -44,6 +34,25 @@ class WeightedTrainer(Trainer):
         return (loss, outputs) if return_outputs else loss
 
 
+class BucketedCollator(DataCollatorWithPadding):
+    # Drops the precomputed length column, which only the sampler reads.
+    def __call__(self, features):
+        return super().__call__(
+            [{k: v for k, v in f.items() if k != "length"} for f in features]
+        )
+
+
+def length_grouping_args():
+    # Batches of similar length pad less. transformers 5 replaced
+    # group_by_length with train_sampling_strategy.
+    if "train_sampling_strategy" in TrainingArguments.__dataclass_fields__:
+        return {
+            "train_sampling_strategy": "group_by_length",
+            "length_column_name": "length",
+        }
+    return {"group_by_length": True, "length_column_name": "length"}
+
+
 def build_label_maps(labels):
     unique = sorted(set(labels))
     label_to_id = {label: i for i, label in enumerate(unique)}
@@ -57,54 +66,49 @@ def main():
     parser.add_argument("--epochs", type=int, default=2)
     parser.add_argument("--batch-size", type=int, default=8)
     parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument(
+        "--num-proc",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Processes used to tokenize the corpus.",
+    )
+    parser.add_argument(
+        "--no-group-by-length",
+        action="store_true",
+        help="Sample training batches randomly instead of by length.",
+    )
     args = parser.parse_args()
 
-    samples = load_samples()
-    texts = [s["text"] for s in samples]
-    labels = [s["label"] for s in samples]
+    corpus = load_corpus()
+    labels = corpus.labels()
     label_to_id, id_to_label = build_label_maps(labels)
     numeric_labels = [label_to_id[l] for l in labels]
 
-    if not texts:
+    if not len(corpus):
         raise ValueError("No samples found. Check preprocessing output.")
 
     min_count = min(Counter(numeric_labels).values())
     stratify_labels = numeric_labels if min_count >= 2 else None
     train_idx, test_idx = train_test_split(
-        list(range(len(texts))),
+        list(range(len(corpus))),
         test_size=0.2,
         random_state=42,
         stratify=stratify_labels,
     )
-    dataset = {
-        "train": Dataset.from_dict(
-            {
-                "text": [texts[i] for i in train_idx],
-                "label": [numeric_labels[i] for i in train_idx],
-            }
-        ),
-        "test": Dataset.from_dict(
-            {
-                "text": [texts[i] for i in test_idx],
-                "label": [numeric_labels[i] for i in test_idx],
-            }
-        ),
-    }
+    split_indices = {"train": train_idx, "test": test_idx}
+    tokenized = load_tokenized_splits(
+        split_indices,
+        {
+            name: [numeric_labels[i] for i in indices]
+            for name, indices in split_indices.items()
+        },
+        args.model,
+        args.max_length,
+        num_proc=args.num_proc,
+    )
 
     tokenizer = AutoTokenizer.from_pretrained(args.model)
-
-    def tokenize(batch):
-        return tokenizer(
-            batch["text"],
-            truncation=True,
-            max_length=args.max_length,
-        )
-
-    tokenized = {
-        split: dataset[split].map(tokenize, batched=True, remove_columns=["text"])
-        for split in dataset
-    }
-    data_collator = DataCollatorWithPadding(tokenizer=tokenizer)
+    data_collator = BucketedCollator(tokenizer=tokenizer)
 
     counts = Counter(numeric_labels)
     max_count = max(counts.values())
@@ -126,6 +130,9 @@ def main():
         logging_steps=25,
         load_best_model_at_end=True,
         report_to=[],
+        # Keeps the length column for the sampler; the collator drops it.
+        remove_unused_columns=False,
+        **({} if args.no_group_by_length else length_grouping_args()),
     )
 
     trainer = WeightedTrainer(
@@ -139,6 +146,8 @@ def main():
     )
 
     trainer.train()
+    # Keep the best checkpoint at the top of the output dir for serving.
+    trainer.save_model("artifacts/hf_model")
     preds = trainer.predict(tokenized["test"])
     pred_labels = np.argmax(preds.predictions, axis=1)
     test_label_ids = sorted(set(tokenized["test"]["label"]))